@@ -0,0 +1,143 @@
+# app/core/admission.py
+import asyncio
+import logging
+from typing import Dict, Optional
+
+from fastapi.responses import JSONResponse
+
+from app.core.config import settings
+from app.core.metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_SHED, API_ERRORS
+
+logger = logging.getLogger(__name__)
+
+# Классы маршрутов с отдельными лимитами
+ROUTE_CLASS_AUTH = "auth"     # bcrypt: вход, регистрация, создание и импорт пользователей
+ROUTE_CLASS_READ = "read"     # чтение из БД
+ROUTE_CLASS_WRITE = "write"   # запись в БД
+
+# Эндпоинты с bcrypt (метод, путь)
+AUTH_ROUTES = {
+    ("POST", "/auth/login"),
+    ("POST", "/auth/register"),
+    ("POST", "/api/users"),
+    ("POST", "/api/admin/users/import"),
+}
+
+# Служебные пути не ограничиваются: балансировщик и Prometheus должны видеть воркер и под нагрузкой.
+# SSE-поток открыт часами и занимал бы слот навсегда; его ограничивает EVENT_MAX_SUBSCRIBERS
+EXEMPT_PATHS = {"/health", "/ready", "/metrics", "/api/events/stream"}
+
+
+def classify_request(method: str, path: str) -> Optional[str]:
+    """Класс маршрута по методу и пути (None — без ограничений)"""
+    if path in EXEMPT_PATHS or method == "OPTIONS":
+        return None
+    if (method, path) in AUTH_ROUTES:
+        return ROUTE_CLASS_AUTH
+    if method in ("GET", "HEAD"):
+        return ROUTE_CLASS_READ
+    return ROUTE_CLASS_WRITE
+
+
+class ConcurrencyLimiter:
+    """Лимит одновременных запросов с короткой ограниченной очередью ожидания"""
+
+    def __init__(self, name: str, limit: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self) -> bool:
+        """Занимает слот; False — запрос нужно отклонить"""
+        if not self._semaphore.locked():
+            await self._semaphore.acquire()
+        else:
+            if self.waiting >= self.queue_size:
+                return False
+
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                self.waiting -= 1
+
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+def overloaded_response(route_class: str) -> JSONResponse:
+    """Ответ 503 в формате ошибок BaseAPIException"""
+    return JSONResponse(
+        status_code=503,
+        headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER_SECONDS)},
+        content={
+            "error": {
+                "code": "OVERLOADED",
+                "message": "Server is overloaded, try again later",
+                "details": {"route_class": route_class}
+            }
+        }
+    )
+
+
+class AdmissionControlMiddleware:
+    """ASGI middleware: ограничение конкурентности по классам маршрутов.
+
+    Лишние запросы ждут в короткой очереди, а при её переполнении или по таймауту
+    сразу получают 503 с Retry-After — задержка не растет без границ,
+    пока БД или bcrypt не справляются.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        queue_timeout = settings.ADMISSION_QUEUE_TIMEOUT_MS / 1000
+        self.limiters: Dict[str, ConcurrencyLimiter] = {
+            ROUTE_CLASS_AUTH: ConcurrencyLimiter(
+                ROUTE_CLASS_AUTH, settings.ADMISSION_AUTH_CONCURRENCY,
+                settings.ADMISSION_AUTH_QUEUE_SIZE, queue_timeout
+            ),
+            ROUTE_CLASS_READ: ConcurrencyLimiter(
+                ROUTE_CLASS_READ, settings.ADMISSION_READ_CONCURRENCY,
+                settings.ADMISSION_READ_QUEUE_SIZE, queue_timeout
+            ),
+            ROUTE_CLASS_WRITE: ConcurrencyLimiter(
+                ROUTE_CLASS_WRITE, settings.ADMISSION_WRITE_CONCURRENCY,
+                settings.ADMISSION_WRITE_QUEUE_SIZE, queue_timeout
+            ),
+        }
+        for name, limiter in self.limiters.items():
+            ADMISSION_IN_FLIGHT.labels(name).set_function(lambda limiter=limiter: limiter.in_flight)
+            ADMISSION_QUEUED.labels(name).set_function(lambda limiter=limiter: limiter.waiting)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = classify_request(scope["method"], scope["path"])
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        limiter = self.limiters[route_class]
+        if not await limiter.acquire():
+            logger.warning(f"Shedding {scope['method']} {scope['path']} ({route_class} limit reached)")
+            ADMISSION_SHED.labels(route_class).inc()
+            API_ERRORS.labels("OVERLOADED").inc()
+            await overloaded_response(route_class)(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
@@ -0,0 +1,100 @@
+# app/core/cache.py
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class CacheBackend(ABC):
+    """Интерфейс бэкенда кэша (in-process или общий для воркеров)"""
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def clear(self) -> None:
+        ...
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Кэш в памяти процесса с TTL и LRU-вытеснением"""
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        if self.max_size <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+
+
+class LocalSharedCacheBackend(CacheBackend):
+    """Локальная замена общего кэша (Redis/Memcached).
+
+    Все экземпляры с одним namespace делят одно хранилище, а значения
+    хранятся сериализованными в JSON — так же, как их увидел бы сетевой кэш.
+    Для настоящего общего кэша достаточно реализовать CacheBackend поверх клиента.
+    """
+
+    _stores: Dict[str, MemoryCacheBackend] = {}
+
+    def __init__(self, namespace: str, max_size: int = 10000):
+        if namespace not in self._stores:
+            self._stores[namespace] = MemoryCacheBackend(max_size)
+        self._store = self._stores[namespace]
+
+    async def get(self, key: str) -> Optional[Any]:
+        raw = await self._store.get(key)
+        return None if raw is None else json.loads(raw)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        await self._store.set(key, json.dumps(value, default=str).encode(), ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._store.delete(key)
+
+    async def clear(self) -> None:
+        await self._store.clear()
+
+
+def create_cache_backend(backend: str, namespace: str, max_size: int) -> CacheBackend:
+    """Создает бэкенд кэша по имени из настроек"""
+    if backend == "memory":
+        return MemoryCacheBackend(max_size)
+    if backend == "shared":
+        return LocalSharedCacheBackend(namespace, max_size)
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -1,18 +1,127 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Dict, List, Optional
 
 class Settings(BaseSettings):
 
     DATABASE_URL: str  
+    DATABASE_REPLICA_URLS: str = ""             # URL реплик для чтения через запятую (пусто — только primary)
     SECRET_KEY: str    # Секретный ключ для JWT токенов
     
     # Настройки со значениями по умолчанию
     ALGORITHM: str = "HS256"                    # Алгоритм шифрования JWT
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30       # Время жизни токена
+    TOKEN_CACHE_SIZE: int = 10000               # Размер кэша проверенных токенов (0 — выключен)
+
+    REPLICA_HEALTH_CHECK_INTERVAL_SECONDS: int = 5  # Период проверки доступности реплик
+
+    # Пул соединений с БД (для primary и каждой реплики)
+    DB_POOL_SIZE: int = 10                      # Постоянные соединения
+    DB_MAX_OVERFLOW: int = 20                   # Дополнительные соединения под пиковую нагрузку
+    DB_POOL_TIMEOUT: int = 30                   # Сколько ждать свободное соединение, секунд
+    DB_POOL_RECYCLE: int = 3600                 # Пересоздавать соединение старше N секунд
+    DB_POOL_PREWARM: int = 5                    # Сколько соединений открыть при старте
+
+    # Readiness: пороги перегрузки воркера
+    HEALTH_DB_PROBE_INTERVAL_SECONDS: int = 5   # Период фонового пинга БД
+    HEALTH_MAX_LOOP_LAG_MS: int = 200           # Допустимая задержка event loop
+    HEALTH_MAX_POOL_SATURATION: float = 0.9     # Допустимая доля занятых соединений пула
+
+    # Admission control: одновременные запросы и очередь ожидания по классам маршрутов
+    ADMISSION_AUTH_CONCURRENCY: int = 16
+    ADMISSION_AUTH_QUEUE_SIZE: int = 32
+    ADMISSION_READ_CONCURRENCY: int = 200
+    ADMISSION_READ_QUEUE_SIZE: int = 200
+    ADMISSION_WRITE_CONCURRENCY: int = 50
+    ADMISSION_WRITE_QUEUE_SIZE: int = 50
+    ADMISSION_QUEUE_TIMEOUT_MS: int = 500       # Максимальное ожидание в очереди
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1      # Значение заголовка Retry-After при отказе
+
+    # Защита входа от перебора: token bucket по email и по IP ("memory" или "shared")
+    LOGIN_THROTTLE_BACKEND: str = "memory"
+    LOGIN_EMAIL_ATTEMPTS_PER_MINUTE: int = 5
+    LOGIN_EMAIL_BURST: int = 10
+    LOGIN_IP_ATTEMPTS_PER_MINUTE: int = 30
+    LOGIN_IP_BURST: int = 60
+    LOGIN_THROTTLE_MAX_KEYS: int = 100000      # Предел числа бакетов в памяти
+
+    # Пул процессов для bcrypt (None — по числу ядер)
+    PASSWORD_HASH_WORKERS: Optional[int] = None
+    PASSWORD_HASH_QUEUE_SIZE: int = 64          # Максимум задач в ожидании сверх числа воркеров
+
+    # Кэш пользователей: "memory" — в процессе, "shared" — общий для воркеров
+    USER_CACHE_BACKEND: str = "memory"
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    USER_LOOKUP_TIMEOUT_SECONDS: float = 5.0     # Таймаут общего (single-flight) запроса пользователя к БД
+    USER_BATCH_MAX_IDS: int = 100                # Максимум id в GET /api/users?ids= и в одном IN-запросе
+
+    # Массовый импорт пользователей (CSV / NDJSON)
+    USER_IMPORT_BATCH_SIZE: int = 500            # Строк импорта на один multi-row INSERT и коммит
+    USER_IMPORT_MAX_ROWS: int = 100000           # Максимум строк в одном файле импорта
+
+    # Поиск заявок: "auto" — FULLTEXT на MySQL, иначе индекс в памяти; "fulltext" или "memory" — явно
+    TICKET_SEARCH_BACKEND: str = "auto"
+
+    # Графики заявок из ticket_rollups
+    TICKET_ROLLUP_MAX_POINTS: int = 1000         # Максимум точек в одном ряду ответа
+
+    # Push-события (WebSocket / SSE): "memory" — в процессе, "shared" — между воркерами
+    EVENT_BROKER_BACKEND: str = "memory"
+    EVENT_SUBSCRIBER_BUFFER_SIZE: int = 256      # Событий в буфере подписчика до отключения как медленного
+    EVENT_MAX_SUBSCRIBERS: int = 5000            # Подписчиков на один воркер
+    EVENT_HEARTBEAT_SECONDS: float = 15.0        # Пинг, если событий не было
+    EVENT_STREAM_TOKEN_SECONDS: int = 60         # Жизнь токена подписки для ?token= (строка запроса попадает в логи доступа)
+
+    # Журнал аудита: очередь в памяти и пакетная запись
+    AUDIT_QUEUE_SIZE: int = 10000                # Сверх этого новые события отбрасываются
+    AUDIT_BATCH_SIZE: int = 200                  # Событий в одном INSERT
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0    # Максимальная задержка записи события
+
+    # SLA заявок: минуты от создания по приоритетам ("приоритет=минуты" через запятую)
+    SLA_ENABLED: bool = True
+    SLA_RESPONSE_MINUTES: str = "critical=15,high=60,medium=240,low=480"          # До взятия в работу
+    SLA_RESOLUTION_MINUTES: str = "critical=240,high=1440,medium=4320,low=10080"  # До решения или закрытия
+    SLA_CATCHUP_INTERVAL_SECONDS: int = 30       # Период досчитывания заявок, изменённых на других воркерах
+
+    # Выбор воркера для фоновых задач в одном экземпляре (аренда строки в leader_leases)
+    LEADER_LEASE_TTL_SECONDS: int = 30           # Аренда истекает, если воркер не продлил её
+    LEADER_LEASE_RENEW_SECONDS: int = 10         # Период продления и попыток захвата
+
+    # Автоназначение заявок наименее загруженному оператору
+    ASSIGNMENT_ENABLED: bool = True
+    ASSIGNMENT_DEFAULT_MAX_OPEN_TICKETS: int = 20   # Предел активных заявок оператора, если не задан в users
+    ASSIGNMENT_RECONCILE_INTERVAL_SECONDS: int = 60  # Период сверки нагрузки и очереди с БД
+    ASSIGNMENT_PENDING_MAX: int = 10000             # Заявок в очереди ожидания в памяти (остальные — после сверки)
+
+    STATS_RECONCILE_INTERVAL_SECONDS: int = 300  # Период сверки счётчиков дашборда с БД
+
+    # Диагностика SQL
+    SLOW_QUERY_THRESHOLD_MS: int = 200          # Порог записи запроса в лог медленных
+    N_PLUS_ONE_THRESHOLD: int = 10              # Сколько одинаковых запросов за HTTP-запрос допустимо
+    
+    @property
+    def replica_urls(self) -> List[str]:
+        """Список URL реплик из DATABASE_REPLICA_URLS"""
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
+    @property
+    def sla_response_minutes(self) -> Dict[str, int]:
+        """Срок реакции по приоритетам из SLA_RESPONSE_MINUTES"""
+        return _parse_minutes(self.SLA_RESPONSE_MINUTES)
+
+    @property
+    def sla_resolution_minutes(self) -> Dict[str, int]:
+        """Срок решения по приоритетам из SLA_RESOLUTION_MINUTES"""
+        return _parse_minutes(self.SLA_RESOLUTION_MINUTES)
     
     class Config:
         env_file = ".env"  
         case_sensitive = False  
 
+def _parse_minutes(value: str) -> Dict[str, int]:
+    """Разбор строки вида critical=15,high=60 в словарь приоритет -> минуты"""
+    pairs = (item.split("=", 1) for item in value.split(",") if item.strip())
+    return {key.strip(): int(minutes) for key, minutes in pairs}
+
 # Создаём экземпляр настроек для импорта в других модулях
-settings = Settings()
\ No newline at end of file
+settings = Settings()
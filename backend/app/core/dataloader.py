@@ -0,0 +1,100 @@
+# app/core/dataloader.py
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, List, Optional, Sequence, Set, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+BatchLoadFn = Callable[[List[K]], Awaitable[Dict[K, V]]]
+
+
+class DataLoader(Generic[K, V]):
+    """Объединяет поштучные load(key) в один пакетный запрос.
+
+    Ключи, запрошенные в пределах одной итерации event loop, копятся и уходят
+    в batch_fn одним вызовом (например, SELECT ... WHERE id IN (...)).
+    Результаты запоминаются на время жизни загрузчика, поэтому экземпляр
+    создаётся на один HTTP-запрос и не делится между запросами.
+
+    batch_fn получает список уникальных ключей и возвращает словарь
+    ключ -> значение; отсутствующие ключи дают None. Пакеты выполняются
+    строго по очереди — batch_fn может пользоваться одной AsyncSession.
+    """
+
+    def __init__(self, batch_fn: BatchLoadFn, max_batch_size: int = 500):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self._futures: Dict[K, asyncio.Future] = {}
+        self._queue: List[K] = []
+        self._dispatch_scheduled = False
+        self._lock = asyncio.Lock()
+        # Event loop держит задачи только по слабым ссылкам
+        self._tasks: Set[asyncio.Task] = set()
+
+    def load(self, key: K) -> "asyncio.Future[Optional[V]]":
+        """Future со значением по ключу; запрос к источнику — при следующей итерации loop"""
+        future = self._futures.get(key)
+        if future is not None:
+            return future
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._futures[key] = future
+        self._queue.append(key)
+
+        if not self._dispatch_scheduled:
+            self._dispatch_scheduled = True
+            loop.call_soon(self._dispatch)
+        return future
+
+    async def load_many(self, keys: Sequence[K]) -> List[Optional[V]]:
+        """Значения в порядке ключей (один пакетный запрос на все промахи)"""
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: K, value: V) -> None:
+        """Кладёт уже известное значение, чтобы не запрашивать его повторно"""
+        if key not in self._futures:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._futures[key] = future
+
+    def _dispatch(self) -> None:
+        self._dispatch_scheduled = False
+        queue, self._queue = self._queue, []
+        task = asyncio.ensure_future(self._load_batches(queue))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _load_batches(self, queue: List[K]) -> None:
+        try:
+            async with self._lock:
+                for start in range(0, len(queue), self.max_batch_size):
+                    await self._load_batch(queue[start:start + self.max_batch_size])
+        except BaseException as exc:
+            # Задачу отменили (например, при остановке воркера): ожидающие не должны зависнуть
+            self._fail(queue, exc)
+            raise
+
+    async def _load_batch(self, keys: List[K]) -> None:
+        try:
+            values = await self.batch_fn(keys)
+        except Exception as exc:
+            self._fail(keys, exc)
+            return
+
+        for key in keys:
+            future = self._futures[key]
+            if not future.done():
+                future.set_result(values.get(key))
+
+    def _fail(self, keys: List[K], exc: BaseException) -> None:
+        # Ошибка не кэшируется: следующий load по этим ключам повторит запрос
+        for key in keys:
+            future = self._futures.get(key)
+            if future is None or future.done():
+                continue
+            del self._futures[key]
+            if isinstance(exc, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(exc)
@@ -1,30 +1,62 @@
-from fastapi import Depends
+from typing import Optional
+
+from fastapi import Depends, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.dataloader import DataLoader
+from app.database import get_db
+from app.services.users import create_user_loader
 
-from app.core.security import verify_token
+from app.core.security import STAFF_ROLES, STREAM_TOKEN_SCOPE, verify_token
 from app.core.exceptions import (
     ForbiddenException,
     NotAuthenticatedException
 )
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    """Зависимость для получения текущего пользователя из токена JWT."""
-    if not credentials:
+def authenticate_token(token: Optional[str], scope: Optional[str] = None) -> dict:
+    """Проверяет JWT и возвращает его payload (общая часть HTTP и WebSocket).
+
+    scope — назначение токена: основной токен (None) не принимается там,
+    где ждут токен подписки, и наоборот.
+    """
+    if not token:
         raise NotAuthenticatedException()
-    
-    token = credentials.credentials
+
     payload = verify_token(token)
     
     if payload is None:
         # Заменили на существующий Exception
         raise NotAuthenticatedException(detail="Invalid token")
+
+    if payload.get("scope") != scope:
+        raise NotAuthenticatedException(detail="Invalid token scope")
         
     return payload
 
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
+    """Зависимость для получения текущего пользователя из токена JWT."""
+    if not credentials:
+        raise NotAuthenticatedException()
+    
+    return authenticate_token(credentials.credentials)
+
+
+async def get_stream_user(
+    token: Optional[str] = Query(None, description="Токен подписки из POST /events/token, если клиент не может передать заголовок (EventSource)"),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)
+) -> dict:
+    """Пользователь для потоковых подписок: заголовок Authorization или ?token= с токеном подписки"""
+    if credentials:
+        return authenticate_token(credentials.credentials)
+    return authenticate_token(token, STREAM_TOKEN_SCOPE)
+
+
 def require_role(required_role: str):
     """Фабрика зависимостей для контроля доступа на основе ролей."""
     async def role_checker(current_user: dict = Depends(get_current_user)) -> dict:
@@ -54,6 +86,15 @@ async def require_operator_or_admin(current_user: dict = Depends(get_current_use
     """Зависимость, требующая роли оператора или администратора.
     Для твоего проекта можно удалить или адаптировать, если нет роли 'operator'."""
     user_role = current_user.get("role")
-    if user_role not in ["operator", "admin"]:
+    if user_role not in STAFF_ROLES:
         raise ForbiddenException(detail="Operator or admin access required")
     return current_user
+
+
+async def get_user_loader(db: AsyncSession = Depends(get_db)) -> DataLoader:
+    """DataLoader пользователей на время HTTP-запроса.
+
+    FastAPI кэширует зависимости в пределах запроса, поэтому все обработчики
+    и зависимости одного запроса получают общий загрузчик и общий IN-запрос.
+    """
+    return create_user_loader(db)
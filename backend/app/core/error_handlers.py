@@ -6,6 +6,7 @@ from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import SQLAlchemyError
 
 from .exceptions import BaseAPIException  
+from .metrics import API_ERRORS
 
 logger = logging.getLogger(__name__)
 
@@ -16,9 +17,11 @@ def setup_exception_handlers(app: FastAPI):
     async def api_exception_handler(request: Request, exc: BaseAPIException):
         """Обработка кастомных API исключений"""
         logger.warning(f"API Exception: {exc.detail} (code: {exc.error_code})")
+        API_ERRORS.labels(exc.error_code or "HTTP_ERROR").inc()
         
         return JSONResponse(
             status_code=exc.status_code,
+            headers=exc.headers,
             content={
                 "error": {
                     "code": exc.error_code,
@@ -44,6 +47,7 @@ def setup_exception_handlers(app: FastAPI):
         }
         
         error_code = error_mapping.get(exc.detail, "HTTP_ERROR")
+        API_ERRORS.labels(error_code).inc()
         
         return JSONResponse(
             status_code=exc.status_code,
@@ -60,6 +64,7 @@ def setup_exception_handlers(app: FastAPI):
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
         """Обработка ошибок валидации Pydantic"""
         logger.warning(f"Validation error: {exc.errors()}")
+        API_ERRORS.labels("VALIDATION_ERROR").inc()
         
         return JSONResponse(
             status_code=422,
@@ -76,6 +81,7 @@ def setup_exception_handlers(app: FastAPI):
     async def sqlalchemy_exception_handler(request: Request, exc: SQLAlchemyError):
         """Обработка ошибок базы данных"""
         logger.error(f"Database error: {str(exc)}")
+        API_ERRORS.labels("DATABASE_ERROR").inc()
         
         return JSONResponse(
             status_code=500,
@@ -92,6 +98,7 @@ def setup_exception_handlers(app: FastAPI):
     async def general_exception_handler(request: Request, exc: Exception):
         """Обработка всех остальных исключений"""
         logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
+        API_ERRORS.labels("INTERNAL_ERROR").inc()
         
         return JSONResponse(
             status_code=500,
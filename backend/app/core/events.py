@@ -0,0 +1,255 @@
+# app/core/events.py
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set
+
+import orjson
+
+from app.core.config import settings
+from app.core.metrics import EVENT_SUBSCRIBERS, EVENT_SUBSCRIBERS_DROPPED, EVENTS_PUBLISHED
+from app.core.security import STAFF_ROLES
+
+logger = logging.getLogger(__name__)
+
+# Топики и роли, которым они доступны
+TOPIC_TICKETS = "tickets"          # все заявки
+TOPIC_MY_TICKETS = "my_tickets"    # заявки текущего пользователя
+TOPIC_AUDIT = "audit"              # входы, регистрации, смена ролей
+
+TOPIC_ROLES = {
+    TOPIC_TICKETS: STAFF_ROLES,
+    TOPIC_AUDIT: {"admin"},
+}
+USER_TOPICS = {TOPIC_MY_TICKETS}
+
+
+def user_channel(user_id: int) -> str:
+    """Канал событий конкретного пользователя (для топика my_tickets)"""
+    return f"user:{user_id}"
+
+
+def allowed_topics(role: Optional[str]) -> Set[str]:
+    return USER_TOPICS | {topic for topic, roles in TOPIC_ROLES.items() if role in roles}
+
+
+class EventMessage:
+    """Событие, сериализованное один раз для всех подписчиков"""
+
+    __slots__ = ("channel", "event_type", "text", "sse")
+
+    def __init__(self, channel: str, event_type: str, text: str):
+        self.channel = channel
+        self.event_type = event_type
+        self.text = text
+        self.sse = f"event: {event_type}\ndata: {text}\n\n".encode()
+
+
+class SubscriptionClosed(Exception):
+    """Подписка закрыта: клиент не успевал читать или воркер останавливается"""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class Subscription:
+    """Ограниченный буфер событий одного подписчика.
+
+    Если клиент не успевает читать и буфер заполнился, подписка закрывается
+    (slow consumer), а не копит события и не тормозит остальных.
+    """
+
+    def __init__(self, channels: Set[str], buffer_size: int):
+        self.channels = channels
+        self.buffer_size = buffer_size
+        self._buffer: Deque[EventMessage] = deque()
+        self._ready = asyncio.Event()
+        self._closed_reason: Optional[str] = None
+
+    def push(self, message: EventMessage) -> bool:
+        if self._closed_reason is not None:
+            return False
+        if len(self._buffer) >= self.buffer_size:
+            self.close("slow_consumer")
+            return False
+        self._buffer.append(message)
+        self._ready.set()
+        return True
+
+    def close(self, reason: str) -> None:
+        if self._closed_reason is None:
+            self._closed_reason = reason
+            self._ready.set()
+
+    async def get(self, timeout: float) -> Optional[EventMessage]:
+        """Следующее событие; None — за timeout событий не было (пора слать heartbeat)"""
+        if not self._buffer and self._closed_reason is None:
+            self._ready.clear()
+            try:
+                await asyncio.wait_for(self._ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        if self._closed_reason is not None:
+            raise SubscriptionClosed(self._closed_reason)
+        return self._buffer.popleft()
+
+
+class EventBroker(ABC):
+    """Доставка событий всем воркерам.
+
+    publish не должен блокировать: сетевой брокер (Redis pub/sub, NATS)
+    буферизует и отправляет из фоновой задачи.
+    """
+
+    @abstractmethod
+    def publish(self, message: EventMessage) -> None:
+        ...
+
+    @abstractmethod
+    async def start(self, deliver: Callable[[EventMessage], None]) -> None:
+        ...
+
+    async def stop(self) -> None:
+        pass
+
+
+class MemoryEventBroker(EventBroker):
+    """События не выходят за пределы процесса (один воркер)"""
+
+    def __init__(self):
+        self._deliver: Optional[Callable[[EventMessage], None]] = None
+
+    def publish(self, message: EventMessage) -> None:
+        if self._deliver is not None:
+            self._deliver(message)
+
+    async def start(self, deliver: Callable[[EventMessage], None]) -> None:
+        self._deliver = deliver
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+
+class LocalSharedEventBroker(EventBroker):
+    """Локальная замена общего брокера (например, Redis pub/sub).
+
+    Все брокеры с одним namespace получают события друг друга, как воркеры,
+    подписанные на один канал Redis.
+    """
+
+    _hubs: Dict[str, List[Callable[[EventMessage], None]]] = {}
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self._deliver: Optional[Callable[[EventMessage], None]] = None
+
+    def publish(self, message: EventMessage) -> None:
+        for deliver in list(self._hubs.get(self.namespace, ())):
+            deliver(message)
+
+    async def start(self, deliver: Callable[[EventMessage], None]) -> None:
+        self._deliver = deliver
+        self._hubs.setdefault(self.namespace, []).append(deliver)
+
+    async def stop(self) -> None:
+        if self._deliver is not None:
+            self._hubs[self.namespace].remove(self._deliver)
+            self._deliver = None
+
+
+def create_event_broker(backend: str, namespace: str) -> EventBroker:
+    """Создает брокер событий по имени из настроек"""
+    if backend == "memory":
+        return MemoryEventBroker()
+    if backend == "shared":
+        return LocalSharedEventBroker(namespace)
+    raise ValueError(f"Unknown event broker backend: {backend}")
+
+
+class EventHub:
+    """Рассылка событий подписчикам WebSocket/SSE этого воркера.
+
+    Событие сериализуется один раз при публикации; доставка — это добавление
+    ссылки в буфер каждого подписчика канала, без запросов к БД.
+    """
+
+    def __init__(self, broker: EventBroker, buffer_size: int, max_subscribers: int):
+        self.broker = broker
+        self.buffer_size = buffer_size
+        self.max_subscribers = max_subscribers
+        self._channels: Dict[str, Set[Subscription]] = {}
+        self._subscriptions: Set[Subscription] = set()
+        self._listeners: Dict[str, List[Callable[[EventMessage], None]]] = {}
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscriptions)
+
+    async def start(self) -> None:
+        await self.broker.start(self._deliver)
+
+    async def stop(self) -> None:
+        await self.broker.stop()
+        for subscription in list(self._subscriptions):
+            subscription.close("shutdown")
+            self.unsubscribe(subscription)
+
+    def publish(self, channel: str, event_type: str, data: dict) -> None:
+        """Публикует событие в канал (топик или user_channel)"""
+        text = orjson.dumps({"topic": channel, "type": event_type, "ts": time.time(), "data": data}).decode()
+        EVENTS_PUBLISHED.labels(channel.split(":")[0]).inc()
+        self.broker.publish(EventMessage(channel, event_type, text))
+
+    def subscribe(self, channels: Iterable[str]) -> Optional[Subscription]:
+        """Новая подписка на каналы; None — превышен лимит подписчиков воркера"""
+        if len(self._subscriptions) >= self.max_subscribers:
+            return None
+        subscription = Subscription(set(channels), self.buffer_size)
+        self._subscriptions.add(subscription)
+        for channel in subscription.channels:
+            self._channels.setdefault(channel, set()).add(subscription)
+        EVENT_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        if subscription not in self._subscriptions:
+            return
+        self._subscriptions.discard(subscription)
+        for channel in subscription.channels:
+            subscribers = self._channels.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[channel]
+        EVENT_SUBSCRIBERS.dec()
+
+    def add_listener(self, channel: str, listener: Callable[[EventMessage], None]) -> None:
+        """Внутренний получатель событий канала (без буфера; не должен блокировать)"""
+        self._listeners.setdefault(channel, []).append(listener)
+
+    def remove_listener(self, channel: str, listener: Callable[[EventMessage], None]) -> None:
+        listeners = self._listeners.get(channel, [])
+        if listener in listeners:
+            listeners.remove(listener)
+
+    def _deliver(self, message: EventMessage) -> None:
+        for listener in list(self._listeners.get(message.channel, ())):
+            try:
+                listener(message)
+            except Exception as exc:
+                logger.error(f"Event listener failed on {message.channel}: {exc}")
+        for subscription in list(self._channels.get(message.channel, ())):
+            if not subscription.push(message):
+                EVENT_SUBSCRIBERS_DROPPED.inc()
+                logger.info(f"Dropping slow event subscriber on {message.channel}")
+                self.unsubscribe(subscription)
+
+
+event_hub = EventHub(
+    create_event_broker(settings.EVENT_BROKER_BACKEND, namespace="events"),
+    buffer_size=settings.EVENT_SUBSCRIBER_BUFFER_SIZE,
+    max_subscribers=settings.EVENT_MAX_SUBSCRIBERS,
+)
@@ -1,10 +1,11 @@
 # app/core/exceptions.py
+import math
 from fastapi import HTTPException, status
 
 class BaseAPIException(HTTPException):
     """Базовое исключение API"""
-    def __init__(self, status_code: int, detail: str, error_code: str = None):
-        super().__init__(status_code=status_code, detail=detail)
+    def __init__(self, status_code: int, detail: str, error_code: str = None, headers: dict = None):
+        super().__init__(status_code=status_code, detail=detail, headers=headers)
         self.error_code = error_code
 
 class NotFoundException(BaseAPIException):
@@ -28,21 +29,73 @@ class ConflictException(BaseAPIException):
     def __init__(self, detail: str = "Resource already exists", error_code: str = "CONFLICT"):
         super().__init__(status_code=status.HTTP_409_CONFLICT, detail=detail, error_code=error_code)
 
+class ServiceUnavailableException(BaseAPIException):
+    """Сервис временно перегружен"""
+    def __init__(self, detail: str = "Service temporarily unavailable", error_code: str = "SERVICE_UNAVAILABLE", retry_after: int = 1):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=detail,
+            error_code=error_code,
+            headers={"Retry-After": str(retry_after)}
+        )
+
+class TooManyRequestsException(BaseAPIException):
+    """Слишком много запросов"""
+    def __init__(self, detail: str = "Too many attempts, try again later", error_code: str = "TOO_MANY_ATTEMPTS", retry_after: float = 1):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail,
+            error_code=error_code,
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+        )
+
 # Специфичные для домена исключения
 class UserNotFoundException(NotFoundException):
     def __init__(self):
         super().__init__(detail="User not found", error_code="USER_NOT_FOUND")
 
+class TicketNotFoundException(NotFoundException):
+    def __init__(self):
+        super().__init__(detail="Ticket not found", error_code="TICKET_NOT_FOUND")
+
+class InvalidCursorException(BadRequestException):
+    def __init__(self):
+        super().__init__(detail="Invalid pagination cursor", error_code="INVALID_CURSOR")
+
+class InvalidIdListException(BadRequestException):
+    def __init__(self, detail: str = "ids must be a comma-separated list of integers"):
+        super().__init__(detail=detail, error_code="INVALID_IDS")
+
+class InvalidSearchQueryException(BadRequestException):
+    def __init__(self):
+        super().__init__(detail="Search query must contain at least one word of 3 or more characters", error_code="INVALID_SEARCH_QUERY")
+
+class InvalidImportFileException(BadRequestException):
+    def __init__(self):
+        super().__init__(detail="Unsupported import file, expected .csv or .ndjson", error_code="INVALID_IMPORT_FILE")
+
+class InvalidAssigneeException(BadRequestException):
+    def __init__(self, detail: str = "Assignee must be an operator"):
+        super().__init__(detail=detail, error_code="INVALID_ASSIGNEE")
+
+class InvalidTimeRangeException(BadRequestException):
+    def __init__(self, detail: str = "Invalid time range"):
+        super().__init__(detail=detail, error_code="INVALID_TIME_RANGE")
+
 class EmailAlreadyExistsException(ConflictException):
     def __init__(self):
         super().__init__(detail="Email already registered", error_code="EMAIL_EXISTS")
 
+class HashingOverloadedException(ServiceUnavailableException):
+    def __init__(self):
+        super().__init__(detail="Password hashing queue is full, try again later", error_code="HASHING_OVERLOADED")
+
 class InvalidCredentialsException(UnauthorizedException):
     def __init__(self):
         super().__init__(detail="Invalid credentials", error_code="INVALID_CREDENTIALS")
 class NotAuthenticatedException(UnauthorizedException):
-    def __init__(self):
-        super().__init__(detail="Not authenticated", error_code="NOT_AUTHENTICATED")
+    def __init__(self, detail: str = "Not authenticated"):
+        super().__init__(detail=detail, error_code="NOT_AUTHENTICATED")
 
 class ForbiddenException(BaseAPIException):
     """Доступ запрещен"""
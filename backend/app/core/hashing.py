@@ -0,0 +1,113 @@
+# app/core/hashing.py
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from app.core.config import settings
+from app.core.exceptions import HashingOverloadedException
+from app.core.metrics import PASSWORD_HASH_DURATION, PASSWORD_HASH_PENDING
+from app.core.security import hash_password, verify_password
+
+logger = logging.getLogger(__name__)
+
+# Паролей в одной задаче пула при пакетном хешировании: задача занимает процесс ~1 с
+HASH_MANY_CHUNK_SIZE = 4
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    """Хеширует пачку паролей в одном процессе (одна пересылка на пачку)"""
+    return [hash_password(password) for password in passwords]
+
+
+class PasswordHasher:
+    """Асинхронный сервис bcrypt поверх пула процессов.
+
+    bcrypt занимает CPU на сотни миллисекунд, поэтому выполняется вне event loop.
+    Число задач в работе и в ожидании ограничено: при переполнении сразу
+    выбрасывается HashingOverloadedException вместо бесконечной очереди.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, queue_size: int = 64):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = self.max_workers + queue_size
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        """Количество задач в работе и в очереди"""
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: форк процесса с работающим event loop и потоками небезопасен
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _submit(self, operation: str, fn, *args):
+        if self._pending >= self.max_pending:
+            logger.warning(f"Password hashing overloaded ({self._pending} pending)")
+            raise HashingOverloadedException()
+
+        self._pending += 1
+        start = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+            PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - start)
+
+    async def hash(self, password: str) -> str:
+        """Хеширует пароль в пуле процессов"""
+        return await self._submit("hash", hash_password, password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Хеширует пачку паролей небольшими задачами по HASH_MANY_CHUNK_SIZE.
+
+        В работе одновременно не больше max_workers - 1 задач пачки, следующая
+        отправляется, только когда завершилась предыдущая. Очередь пула FIFO,
+        поэтому вход и регистрация ждут не дольше одной маленькой задачи,
+        а при нескольких процессах один из них всегда свободен.
+        """
+        if not passwords:
+            return []
+        chunks = [passwords[i:i + HASH_MANY_CHUNK_SIZE] for i in range(0, len(passwords), HASH_MANY_CHUNK_SIZE)]
+        slots = asyncio.Semaphore(max(1, self.max_workers - 1))
+
+        async def hash_chunk(chunk: List[str]) -> List[str]:
+            async with slots:
+                return await self._submit("hash_many", hash_passwords, chunk)
+
+        results = await asyncio.gather(*(hash_chunk(chunk) for chunk in chunks))
+        return [hashed for chunk in results for hashed in chunk]
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Проверяет пароль в пуле процессов"""
+        return await self._submit("verify", verify_password, plain_password, hashed_password)
+
+    async def warmup(self) -> None:
+        """Запускает все процессы пула и прогревает в них bcrypt"""
+        hashed = await self.hash("warmup-password")
+        await asyncio.gather(*(self.verify("warmup-password", hashed) for _ in range(self.max_workers)))
+
+    def shutdown(self) -> None:
+        """Останавливает пул процессов"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+
+PASSWORD_HASH_PENDING.set_function(lambda: password_hasher.pending)
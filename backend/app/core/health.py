@@ -0,0 +1,98 @@
+# app/core/health.py
+import asyncio
+import logging
+import time
+from typing import Optional, Tuple
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.hashing import password_hasher
+from app.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+class HealthMonitor:
+    """Состояние воркера для readiness-проверки.
+
+    Пинг БД и замер задержки event loop выполняются фоновыми задачами,
+    а /ready только читает последние результаты — пробы балансировщика
+    не создают нагрузки на БД.
+    """
+
+    def __init__(self):
+        self.db_ok: Optional[bool] = None
+        self.db_latency_ms: Optional[float] = None
+        self.db_error: Optional[str] = None
+        self._db_checked_at: Optional[float] = None
+        self.loop_lag_ms = 0.0
+
+    async def probe_db(self, timeout: float = 2.0) -> None:
+        start = time.perf_counter()
+        try:
+            async with engine.connect() as conn:
+                await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout)
+        except Exception as exc:
+            self.db_ok = False
+            self.db_error = str(exc) or type(exc).__name__
+            logger.warning(f"Database probe failed: {self.db_error}")
+        else:
+            self.db_ok = True
+            self.db_error = None
+            self.db_latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        self._db_checked_at = time.monotonic()
+
+    async def run_db_probe(self, interval: float) -> None:
+        """Фоновая задача: пинг БД каждые interval секунд"""
+        while True:
+            await self.probe_db()
+            await asyncio.sleep(interval)
+
+    async def run_loop_lag_monitor(self, interval: float = 0.5) -> None:
+        """Фоновая задача: насколько позже запланированного просыпается event loop"""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            lag = time.perf_counter() - start - interval
+            self.loop_lag_ms = round(max(lag, 0.0) * 1000, 2)
+
+    @staticmethod
+    def pool_saturation() -> float:
+        """Доля занятых соединений от максимума пула (с overflow)"""
+        capacity = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+        return round(engine.pool.checkedout() / capacity, 3) if capacity else 0.0
+
+    def readiness(self) -> Tuple[bool, dict]:
+        """Готов ли воркер принимать трафик и почему"""
+        db_age = None
+        if self._db_checked_at is not None:
+            db_age = round(time.monotonic() - self._db_checked_at, 3)
+
+        db_fresh = db_age is not None and db_age <= settings.HEALTH_DB_PROBE_INTERVAL_SECONDS * 3
+        saturation = self.pool_saturation()
+
+        checks = {
+            "database": {
+                "ok": bool(self.db_ok) and db_fresh,
+                "latency_ms": self.db_latency_ms,
+                "checked_seconds_ago": db_age,
+                "error": self.db_error,
+            },
+            "pool": {
+                "ok": saturation < settings.HEALTH_MAX_POOL_SATURATION,
+                "saturation": saturation,
+            },
+            "event_loop": {
+                "ok": self.loop_lag_ms < settings.HEALTH_MAX_LOOP_LAG_MS,
+                "lag_ms": self.loop_lag_ms,
+            },
+            "password_hashing": {
+                "ok": password_hasher.pending < password_hasher.max_pending,
+                "pending": password_hasher.pending,
+            },
+        }
+        return all(check["ok"] for check in checks.values()), checks
+
+
+health_monitor = HealthMonitor()
@@ -0,0 +1,93 @@
+# app/core/leader.py
+import logging
+import os
+import socket
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core.metrics import LEADER
+from app.database import AsyncSessionLocal
+from app.models.lease import LeaderLease
+
+logger = logging.getLogger(__name__)
+
+
+class LeaderElection:
+    """Выбор одного воркера для фоновой задачи через аренду строки в leader_leases.
+
+    acquire() захватывает свободную или истёкшую аренду либо продлевает свою
+    одним UPDATE; первую строку создаёт INSERT, а гонку за неё решает первичный
+    ключ. Если БД недоступна, воркер считает себя лидером только до конца уже
+    продлённой аренды — к этому моменту её может забрать другой воркер.
+    Часы воркеров должны расходиться меньше, чем на ttl - renew_interval.
+    """
+
+    def __init__(self, name: str, ttl: float):
+        self.name = name
+        self.ttl = ttl
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._valid_until = 0.0
+
+    @property
+    def is_leader(self) -> bool:
+        return time.monotonic() < self._valid_until
+
+    async def acquire(self) -> bool:
+        """Захват или продление аренды; True — этот воркер лидер"""
+        started = time.monotonic()
+        now = datetime.utcnow()
+        values = {"holder": self.holder, "expires_at": now + timedelta(seconds=self.ttl)}
+        try:
+            async with AsyncSessionLocal() as session:
+                result = await session.execute(
+                    update(LeaderLease)
+                    .where(
+                        LeaderLease.name == self.name,
+                        or_(LeaderLease.holder == self.holder, LeaderLease.expires_at < now),
+                    )
+                    .values(**values)
+                )
+                if result.rowcount == 0:
+                    try:
+                        await session.execute(insert(LeaderLease).values(name=self.name, **values))
+                    except IntegrityError:
+                        # Аренда есть и принадлежит другому воркеру
+                        self._step_down()
+                        return False
+                await session.commit()
+        except Exception as exc:
+            logger.error(f"Leader lease '{self.name}' renewal failed: {exc}")
+            return self.is_leader
+
+        if not self.is_leader:
+            logger.info(f"Acquired leader lease '{self.name}' as {self.holder}")
+        # Отсчёт от начала попытки: аренда в БД могла начаться раньше, чем пришёл ответ
+        self._valid_until = started + self.ttl
+        LEADER.labels(self.name).set(1)
+        return True
+
+    async def release(self) -> None:
+        """Освобождает аренду, чтобы другой воркер подхватил задачу без ожидания ttl"""
+        if not self.is_leader:
+            return
+        self._step_down()
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(
+                    update(LeaderLease)
+                    .where(LeaderLease.name == self.name, LeaderLease.holder == self.holder)
+                    .values(expires_at=datetime.utcnow())
+                )
+                await session.commit()
+        except Exception as exc:
+            logger.error(f"Leader lease '{self.name}' release failed: {exc}")
+
+    def _step_down(self) -> None:
+        if self.is_leader:
+            logger.info(f"Lost leader lease '{self.name}'")
+        self._valid_until = 0.0
+        LEADER.labels(self.name).set(0)
@@ -0,0 +1,145 @@
+# app/core/metrics.py
+import time
+
+from prometheus_client import Counter, Gauge, Histogram
+
+# Границы бакетов задержки (секунды): от быстрых ответов из кэша до медленных запросов
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route"],
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "HTTP requests by route template and status code",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being processed",
+    ["method"],
+)
+API_ERRORS = Counter(
+    "api_errors_total",
+    "Error responses by error_code",
+    ["error_code"],
+)
+
+DB_POOL_CHECKOUT_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_IN_USE = Gauge("db_pool_connections_in_use", "Connections checked out from the pool")
+DB_POOL_SIZE = Gauge("db_pool_size", "Configured pool size")
+DB_POOL_OVERFLOW = Gauge("db_pool_overflow", "Connections opened above pool size")
+
+PASSWORD_HASH_DURATION = Histogram(
+    "password_hash_duration_seconds",
+    "bcrypt hash/verify time including queueing in the process pool",
+    ["operation"],
+    buckets=(0.05, 0.1, 0.2, 0.3, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+PASSWORD_HASH_PENDING = Gauge("password_hash_pending", "bcrypt jobs running or queued")
+
+ADMISSION_SHED = Counter(
+    "admission_shed_total",
+    "Requests rejected by admission control",
+    ["route_class"],
+)
+ADMISSION_IN_FLIGHT = Gauge("admission_in_flight", "Requests admitted and running", ["route_class"])
+ADMISSION_QUEUED = Gauge("admission_queued", "Requests waiting for admission", ["route_class"])
+
+SINGLEFLIGHT_CALLS = Counter(
+    "singleflight_calls_total",
+    "Coalesced lookups: leader runs the query, shared waits for the leader",
+    ["name", "role"],
+)
+
+AUDIT_EVENTS = Counter(
+    "audit_events_total",
+    "Audit events by outcome: queued, written, dropped (queue full), failed (DB error)",
+    ["outcome"],
+)
+AUDIT_QUEUE_DEPTH = Gauge("audit_queue_depth", "Audit events waiting to be written")
+
+EVENT_SUBSCRIBERS = Gauge("event_subscribers", "Open WebSocket/SSE event subscriptions")
+EVENTS_PUBLISHED = Counter("events_published_total", "Events published to the hub", ["topic"])
+EVENT_SUBSCRIBERS_DROPPED = Counter(
+    "event_subscribers_dropped_total",
+    "Subscriptions closed because the client could not keep up",
+)
+
+LEADER = Gauge("leader", "1 if this worker holds the lease for the named background job", ["name"])
+
+ASSIGNMENTS = Counter(
+    "ticket_assignments_total",
+    "Auto-assignment outcomes: assigned, queued (no operator with capacity), conflict (ticket changed meanwhile), "
+    "full (operator cap reached by other workers)",
+    ["outcome"],
+)
+ASSIGNMENT_DECISION_SECONDS = Histogram(
+    "ticket_assignment_decision_seconds",
+    "Time to pick an operator from the in-memory load heaps",
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01),
+)
+ASSIGNMENT_WAIT_SECONDS = Histogram(
+    "ticket_assignment_wait_seconds",
+    "Time from ticket creation to assignment",
+    buckets=(0.1, 1, 10, 60, 300, 900, 3600, 14400, 86400),
+)
+ASSIGNMENT_QUEUE_DEPTH = Gauge("ticket_assignment_queue_depth", "Tickets waiting for an operator with capacity")
+
+SLA_BREACHES = Counter("sla_breaches_total", "SLA breaches fired", ["kind", "priority"])
+SLA_SCHEDULED = Gauge("sla_scheduled_deadlines", "SLA deadlines waiting in the scheduler")
+SLA_FIRE_DELAY = Histogram(
+    "sla_fire_delay_seconds",
+    "Time between an SLA deadline and firing its breach",
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30, 300),
+)
+
+# Метка для запросов, не совпавших ни с одним маршрутом (чтобы сканеры не раздували кардинальность)
+UNMATCHED_ROUTE = "__unmatched__"
+
+
+class PrometheusMiddleware:
+    """ASGI middleware: задержка по шаблону маршрута и число запросов в работе.
+
+    Сделано на чистом ASGI, без BaseHTTPMiddleware, чтобы не создавать лишних задач
+    и оставить накладные расходы на уровне пары обращений к счётчикам.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+
+            # FastAPI кладёт найденный маршрут в scope при роутинге
+            route = scope.get("route")
+            template = getattr(route, "path", UNMATCHED_ROUTE)
+            REQUEST_LATENCY.labels(method, template).observe(elapsed)
+            REQUESTS_TOTAL.labels(method, template, str(status_code)).inc()
@@ -0,0 +1,110 @@
+# app/core/query_stats.py
+import logging
+import re
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(statement: str) -> str:
+    """Форма запроса без литералов: одинаковые запросы с разными параметрами совпадают"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = shape.replace("%s", "?")
+    shape = _STRING_LITERAL.sub("?", shape)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    # IN (?, ?, ?) разной длины — одна и та же форма
+    return _PLACEHOLDER_LIST.sub("(?...)", shape)
+
+
+class RequestQueryStats:
+    """Статистика запросов к БД в рамках одного HTTP-запроса"""
+
+    __slots__ = ("path", "count", "total_time", "shapes")
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes: Dict[str, int] = {}
+
+    def record(self, shape: str, elapsed: float) -> int:
+        """Учитывает запрос и возвращает, сколько раз выполнялась эта форма"""
+        self.count += 1
+        self.total_time += elapsed
+        repeats = self.shapes.get(shape, 0) + 1
+        self.shapes[shape] = repeats
+        return repeats
+
+    def server_timing(self) -> bytes:
+        return f'db;dur={self.total_time * 1000:.2f};desc="{self.count} queries"'.encode()
+
+
+_current_stats: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подключает замер запросов к движку (события курсора синхронного ядра)"""
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+        shape = normalize_sql(statement)
+
+        if elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            logger.warning(f"Slow query ({elapsed * 1000:.1f} ms): {shape}")
+
+        stats = _current_stats.get()
+        if stats is None:
+            return
+
+        repeats = stats.record(shape, elapsed)
+        if repeats == settings.N_PLUS_ONE_THRESHOLD + 1:
+            logger.warning(
+                f"Possible N+1 in {stats.path}: statement executed more than "
+                f"{settings.N_PLUS_ONE_THRESHOLD} times: {shape}"
+            )
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware: считает запросы к БД и добавляет заголовок Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope["path"])
+        token = _current_stats.set(stats)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"server-timing", stats.server_timing())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_stats.reset(token)
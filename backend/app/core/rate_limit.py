@@ -0,0 +1,117 @@
+# app/core/rate_limit.py
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+
+from app.core.exceptions import TooManyRequestsException
+
+
+class RateLimitBackend(ABC):
+    """Хранилище token bucket'ов (in-process или общее для воркеров)"""
+
+    @abstractmethod
+    async def consume(self, key: str, rate: float, capacity: float) -> float:
+        """Забирает один токен. Возвращает 0, если разрешено, иначе секунды до следующего токена."""
+        ...
+
+
+class MemoryRateLimitBackend(RateLimitBackend):
+    """Token bucket'ы в памяти процесса.
+
+    На ключ хранится только кортеж (токены, время обновления, время наполнения);
+    число ключей ограничено. Вытесняются только уже наполнившиеся бакеты —
+    их удаление ничего не меняет — начиная с давно не использованных (LRU).
+    Если таких нет, новый ключ получает отказ до наполнения самого старого
+    бакета: иначе перебор max_keys случайных ключей сбрасывал бы чужой лимит.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def consume(self, key: str, rate: float, capacity: float) -> float:
+        now = time.monotonic()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            wait = self._make_room(now)
+            if wait:
+                return wait
+            bucket = (capacity, now, now)
+        tokens, updated_at, _ = bucket
+        tokens = min(capacity, tokens + (now - updated_at) * rate)
+
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+        self._buckets.move_to_end(key)
+        return wait
+
+    def _make_room(self, now: float) -> float:
+        """Освобождает место под новый ключ; возвращает секунды ожидания, если освободить нечего"""
+        while len(self._buckets) >= self.max_keys:
+            oldest = next(iter(self._buckets.values()))
+            if oldest[2] > now:
+                return oldest[2] - now
+            self._buckets.popitem(last=False)
+        return 0.0
+
+
+class LocalSharedRateLimitBackend(RateLimitBackend):
+    """Локальная замена общего хранилища лимитов (например, Redis со скриптом token bucket).
+
+    Все экземпляры с одним namespace делят бакеты. Для работы между воркерами
+    достаточно реализовать consume атомарно на стороне общего хранилища.
+    """
+
+    _stores: Dict[str, MemoryRateLimitBackend] = {}
+
+    def __init__(self, namespace: str, max_keys: int = 100000):
+        if namespace not in self._stores:
+            self._stores[namespace] = MemoryRateLimitBackend(max_keys)
+        self._store = self._stores[namespace]
+
+    async def consume(self, key: str, rate: float, capacity: float) -> float:
+        return await self._store.consume(key, rate, capacity)
+
+
+def create_rate_limit_backend(backend: str, namespace: str, max_keys: int) -> RateLimitBackend:
+    """Создает бэкенд лимитов по имени из настроек"""
+    if backend == "memory":
+        return MemoryRateLimitBackend(max_keys)
+    if backend == "shared":
+        return LocalSharedRateLimitBackend(namespace, max_keys)
+    raise ValueError(f"Unknown rate limit backend: {backend}")
+
+
+class LoginThrottle:
+    """Ограничение попыток входа по email и по IP клиента"""
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        email_per_minute: int,
+        email_burst: int,
+        ip_per_minute: int,
+        ip_burst: int,
+    ):
+        self.backend = backend
+        self.email_rate = email_per_minute / 60
+        self.email_burst = email_burst
+        self.ip_rate = ip_per_minute / 60
+        self.ip_burst = ip_burst
+
+    async def check(self, email: str, client_ip: Optional[str]) -> None:
+        """Выбрасывает TooManyRequestsException, если попытка сверх лимита"""
+        if client_ip:
+            wait = await self.backend.consume(f"login:ip:{client_ip}", self.ip_rate, self.ip_burst)
+            if wait:
+                raise TooManyRequestsException(retry_after=wait)
+
+        wait = await self.backend.consume(f"login:email:{email.strip().lower()}", self.email_rate, self.email_burst)
+        if wait:
+            raise TooManyRequestsException(retry_after=wait)
@@ -0,0 +1,45 @@
+# app/core/responses.py
+from typing import Optional
+
+from fastapi import Request, Response
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel
+
+JSON_MEDIA_TYPE = "application/json"
+
+# Клиент хранит ответ, но перед использованием сверяет ETag с сервером
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def model_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Сериализует pydantic-модель сразу в JSON-байты через pydantic-core.
+
+    Обходит повторную валидацию response_model и проход jsonable_encoder:
+    модель один раз превращается в bytes без промежуточного dict.
+    """
+    return Response(
+        content=model.__pydantic_serializer__.to_json(model),
+        status_code=status_code,
+        media_type=JSON_MEDIA_TYPE,
+    )
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Совпадает ли ETag с If-None-Match (слабое сравнение, как требует RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in if_none_match.split(",")
+    )
+
+
+def conditional_json_response(request: Request, content: dict, etag: str) -> Response:
+    """304 без тела, если у клиента актуальная версия, иначе JSON с ETag"""
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(content, headers=headers)
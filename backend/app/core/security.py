@@ -2,9 +2,19 @@ from passlib.context import CryptContext
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from app.core.config import settings
+from app.core.token_cache import TokenCache
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# Роли, которые видят все заявки (REST и топик событий tickets)
+STAFF_ROLES = frozenset({"operator", "admin"})
+
+# Токен подписки на события: его передают в ?token=, поэтому он короткий и годится только для потоков
+STREAM_TOKEN_SCOPE = "stream"
+
+# Кэш уже проверенных токенов (повторная проверка HMAC не нужна)
+token_cache = TokenCache(max_size=settings.TOKEN_CACHE_SIZE)
+
 def hash_password(password: str) -> str: 
     """Хеширует пароль"""
     return pwd_context.hash(password)  
@@ -25,10 +35,24 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_stream_token(payload: dict) -> str:
+    """Короткоживущий токен для SSE и WebSocket по payload основного токена"""
+    return create_access_token(
+        {"sub": payload["sub"], "role": payload.get("role"), "scope": STREAM_TOKEN_SCOPE},
+        expires_delta=timedelta(seconds=settings.EVENT_STREAM_TOKEN_SECONDS),
+    )
+
 def verify_token(token: str):
     """Проверяет JWT токен"""
+    cache_key = token_cache.make_key(token, settings.SECRET_KEY, settings.ALGORITHM)
+    payload = token_cache.get(cache_key)
+    if payload is not None:
+        return payload
+
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+
+    token_cache.set(cache_key, payload)
+    return payload
@@ -0,0 +1,60 @@
+# app/core/singleflight.py
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+from app.core.metrics import SINGLEFLIGHT_CALLS
+
+
+class _Call:
+    """Выполняющийся вызов и число запросов, ожидающих его результат"""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Схлопывает одинаковые одновременные вызовы в один.
+
+    Первый вызов с ключом запускает fn отдельной задачей, остальные ждут её
+    результат. Отмена одного ожидающего (клиент закрыл соединение) не отменяет
+    общий вызов; он отменяется, только когда ждать его больше некому.
+    Таймаут ограничивает сам вызов, поэтому зависший запрос не держит ключ.
+    """
+
+    def __init__(self, name: str, timeout: float):
+        self.name = name
+        self.timeout = timeout
+        self._calls: Dict[Hashable, _Call] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        # Отменённый вызов ещё может висеть до done-callback: к нему не присоединяемся
+        if call is None or call.task.cancelled():
+            task = asyncio.ensure_future(asyncio.wait_for(fn(), self.timeout))
+            call = self._calls[key] = _Call(task)
+            task.add_done_callback(lambda _, key=key, call=call: self._forget(key, call))
+            SINGLEFLIGHT_CALLS.labels(self.name, "leader").inc()
+        else:
+            SINGLEFLIGHT_CALLS.labels(self.name, "shared").inc()
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                # Ключ освобождается до отмены: следующий запрос запустит новый вызов
+                if self._calls.get(key) is call:
+                    del self._calls[key]
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        # Ключ освобождается сразу по завершении: следующий промах пойдёт в БД заново
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Исключение забирают ожидающие; если их не осталось, не засоряем лог
+        if not call.task.cancelled():
+            call.task.exception()
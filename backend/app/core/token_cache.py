@@ -0,0 +1,65 @@
+# app/core/token_cache.py
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class TokenCache:
+    """LRU-кэш проверенных JWT payload.
+
+    Ключ — SHA-256 от секрета, алгоритма и самого токена: при смене
+    SECRET_KEY или ALGORITHM старые записи просто перестают совпадать.
+    Запись удаляется, как только наступает её `exp`.
+    """
+
+    def __init__(self, max_size: int = 10000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, tuple]" = OrderedDict()
+
+    @staticmethod
+    def make_key(token: str, secret_key: str, algorithm: str) -> bytes:
+        """Дайджест токена вместе с параметрами проверки"""
+        return hashlib.sha256(f"{secret_key}\x00{algorithm}\x00{token}".encode()).digest()
+
+    def get(self, key: bytes) -> Optional[dict]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        payload, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(payload)
+
+    def set(self, key: bytes, payload: dict) -> None:
+        if self.max_size <= 0:
+            return
+
+        exp = payload.get("exp")
+        expires_at = float(exp) if isinstance(exp, (int, float)) else None
+
+        self._entries[key] = (dict(payload), expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """Счётчики попаданий и промахов"""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
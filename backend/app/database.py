@@ -1,41 +1,157 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+import itertools
+import logging
+import time
+from typing import List
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.engine import make_url
 from urllib.parse import quote
 from app.core.config import settings
+from app.core.query_stats import instrument_engine
+from app.core.metrics import DB_POOL_CHECKOUT_WAIT, DB_POOL_IN_USE, DB_POOL_SIZE, DB_POOL_OVERFLOW
+
+logger = logging.getLogger(__name__)
 
 Base = declarative_base()
 
 def create_async_database_url(database_url: str) -> str:
     """Создает асинхронный URL правильным экранированием"""
     original_url = make_url(database_url)
-    
+
+    # SQLite (локальные и тестовые базы) — через aiosqlite
+    if original_url.get_backend_name() == "sqlite":
+        return f"sqlite+aiosqlite:///{original_url.database}"
+
     escaped_password = quote(original_url.password, safe='')
-    
+
     async_url = (
         f"mysql+aiomysql://{original_url.username}:{escaped_password}"
         f"@{original_url.host}:{original_url.port}/{original_url.database}"
     )
-    
+
     return async_url
 
-# Создать асинхронный движок базы данных с объединением подключений
-async_database_url = create_async_database_url(settings.DATABASE_URL)
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Пул соединений с замером времени ожидания соединения"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start)
+
+def create_database_engine(database_url: str) -> AsyncEngine:
+    """Создать асинхронный движок базы данных с объединением подключений"""
+    async_url = create_async_database_url(database_url)
+
+    pool_options = {
+        "poolclass": InstrumentedPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+    }
+
+    if async_url.startswith("sqlite"):
+        new_engine = create_async_engine(async_url, **pool_options)
+    else:
+        new_engine = create_async_engine(
+            async_url,
+            pool_pre_ping=True,
+            connect_args={"connect_timeout": 10},
+            **pool_options
+        )
+
+    instrument_engine(new_engine)
+    return new_engine
+
+def create_session_factory(bind: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(
+        bind,
+        class_=AsyncSession,
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False
+    )
+
+# Primary: все записи и чтения, которым нужно видеть собственные записи
+engine = create_database_engine(settings.DATABASE_URL)
+
+# Состояние пула читается при каждом scrape /metrics
+DB_POOL_IN_USE.set_function(lambda: engine.pool.checkedout())
+DB_POOL_SIZE.set_function(lambda: engine.pool.size())
+DB_POOL_OVERFLOW.set_function(lambda: max(engine.pool.overflow(), 0))
+
+AsyncSessionLocal = create_session_factory(engine)
+
+
+class Replica:
+    """Реплика для чтения и признак её доступности"""
+
+    def __init__(self, database_url: str):
+        self.engine = create_database_engine(database_url)
+        self.session_factory = create_session_factory(self.engine)
+        self.healthy = True
+
+        # Обрыв соединения сразу выводит реплику из ротации до следующей проверки
+        @event.listens_for(self.engine.sync_engine, "handle_error")
+        def on_error(context):
+            if context.is_disconnect or context.connection is None:
+                self.mark_unhealthy()
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
 
-engine = create_async_engine(
-    async_database_url,
-    pool_pre_ping=True,
-    pool_recycle=3600,
-    connect_args={"connect_timeout": 10}
-)
+    def mark_unhealthy(self) -> None:
+        if self.healthy:
+            logger.warning(f"Replica {self.name} marked unhealthy")
+        self.healthy = False
 
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    autocommit=False,
-    autoflush=False,
-    expire_on_commit=False
-)
+
+class ReplicaRouter:
+    """Выбор сессии для чтения: здоровые реплики по кругу, иначе primary"""
+
+    def __init__(self, replica_urls: List[str]):
+        self.replicas = [Replica(url) for url in replica_urls]
+        self._counter = itertools.count()
+
+    def read_session_factory(self) -> async_sessionmaker:
+        healthy = [replica for replica in self.replicas if replica.healthy]
+        if not healthy:
+            return AsyncSessionLocal
+        return healthy[next(self._counter) % len(healthy)].session_factory
+
+    async def check_health(self, timeout: float = 2.0) -> None:
+        """Пингует реплики и обновляет признак доступности"""
+        for replica in self.replicas:
+            try:
+                async with replica.engine.connect() as conn:
+                    await asyncio.wait_for(conn.execute(text("SELECT 1")), timeout)
+            except Exception as exc:
+                logger.debug(f"Replica health check failed: {exc}")
+                replica.mark_unhealthy()
+            else:
+                if not replica.healthy:
+                    logger.info(f"Replica {replica.name} is healthy again")
+                replica.healthy = True
+
+    async def run_health_checks(self, interval: float) -> None:
+        """Фоновая задача проверки реплик"""
+        while True:
+            await self.check_health()
+            await asyncio.sleep(interval)
+
+    async def dispose(self) -> None:
+        for replica in self.replicas:
+            await replica.engine.dispose()
+
+
+replica_router = ReplicaRouter(settings.replica_urls)
 
 async def get_db():
     async with AsyncSessionLocal() as session:
@@ -44,6 +160,56 @@ async def get_db():
         finally:
             await session.close()
 
+async def get_read_db():
+    """Сессия только для чтения: реплика, если она настроена и доступна.
+
+    Данные могут отставать от primary на лаг репликации, поэтому обработчики,
+    которым нужно увидеть только что записанное (read-your-writes), используют get_db.
+    """
+    async with replica_router.read_session_factory()() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
+async def prewarm_pool(target_engine: AsyncEngine, connections: int) -> int:
+    """Заранее открывает соединения, чтобы первые запросы не платили за handshake.
+
+    Соединения открываются параллельно и возвращаются в пул (не больше pool_size).
+    Возвращает число успешно открытых соединений.
+    """
+    connections = min(connections, target_engine.pool.size())
+
+    async def open_connection():
+        conn = await target_engine.connect()
+        try:
+            await conn.execute(text("SELECT 1"))
+        except Exception:
+            await conn.close()
+            raise
+        return conn
+
+    results = await asyncio.gather(
+        *(open_connection() for _ in range(connections)),
+        return_exceptions=True
+    )
+
+    opened = 0
+    for result in results:
+        if isinstance(result, BaseException):
+            logger.error(f"Connection pre-warm failed: {result}")
+            continue
+        await result.close()
+        opened += 1
+    return opened
+
+async def prewarm_all_pools(connections: int) -> None:
+    """Прогрев пула primary и всех реплик"""
+    opened = await prewarm_pool(engine, connections)
+    logger.info(f"Pre-warmed {opened} primary connections")
+    for replica in replica_router.replicas:
+        await prewarm_pool(replica.engine, connections)
+
 async def create_tables():
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
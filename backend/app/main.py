@@ -1,32 +1,101 @@
-from fastapi import FastAPI, Depends
+import asyncio
+import logging
+from fastapi import FastAPI, Depends, Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from sqlalchemy import text
 from app.core.config import settings
-from app.database import get_db, engine
+from app.database import get_db, engine, replica_router, prewarm_all_pools
 from sqlalchemy.ext.asyncio import AsyncSession
 from contextlib import asynccontextmanager
 from app.core.error_handlers import setup_exception_handlers
+from app.core.hashing import password_hasher
+from app.core.health import health_monitor
+from app.core.events import event_hub
+from app.core.security import create_access_token, verify_token
+from app.core.metrics import PrometheusMiddleware
+from app.core.admission import AdmissionControlMiddleware
+from app.core.query_stats import QueryStatsMiddleware
+from app.services.assignment import assignment_engine
+from app.services.audit import audit_log
+from app.services.sla import sla_engine
+from app.services.stats import dashboard_stats
+from app.services.ticket_search import ticket_search
 from datetime import datetime
 from fastapi.middleware.cors import CORSMiddleware
 
+logger = logging.getLogger(__name__)
+
 # Управление событиями запуска и выключения приложений
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Starting FastAPI application...")
+
+    # Прогрев до того, как воркер начнет принимать трафик
+    await prewarm_all_pools(settings.DB_POOL_PREWARM)
+    # Ошибки прогрева не мешают старту: пул и кэш поднимутся на первых запросах
+    try:
+        await password_hasher.warmup()
+    except Exception as exc:
+        logger.error(f"Password hasher pre-warm failed: {exc}")
+    try:
+        verify_token(create_access_token({"sub": "warmup"}))
+    except Exception as exc:
+        logger.error(f"JWT pre-warm failed: {exc}")
+    await ticket_search.start()
+    await event_hub.start()
+
+    # Первый пинг до старта, чтобы /ready сразу отражал состояние БД
+    await health_monitor.probe_db()
+
+    # Фоновые задачи воркера
+    background_tasks = [
+        asyncio.create_task(dashboard_stats.run_reconciler(settings.STATS_RECONCILE_INTERVAL_SECONDS)),
+        asyncio.create_task(health_monitor.run_db_probe(settings.HEALTH_DB_PROBE_INTERVAL_SECONDS)),
+        asyncio.create_task(health_monitor.run_loop_lag_monitor()),
+        asyncio.create_task(audit_log.run_writer()),
+    ]
+    if settings.ASSIGNMENT_ENABLED:
+        background_tasks.append(asyncio.create_task(
+            assignment_engine.run(settings.ASSIGNMENT_RECONCILE_INTERVAL_SECONDS)
+        ))
+    if settings.SLA_ENABLED:
+        # Сроки SLA отслеживает один воркер — держатель аренды в leader_leases
+        background_tasks.append(asyncio.create_task(sla_engine.run(
+            settings.LEADER_LEASE_RENEW_SECONDS,
+            settings.SLA_CATCHUP_INTERVAL_SECONDS,
+        )))
+    if replica_router.replicas:
+        background_tasks.append(asyncio.create_task(
+            replica_router.run_health_checks(settings.REPLICA_HEALTH_CHECK_INTERVAL_SECONDS)
+        ))
     yield
     print("Shutting down FastAPI application...")
+    # Закрыть подписки, чтобы SSE/WebSocket не держали остановку воркера
+    await event_hub.stop()
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    # Дописать накопленные события аудита, пока пул ещё открыт
+    await audit_log.flush()
+    password_hasher.shutdown()
+    await replica_router.dispose()
     await engine.dispose()
 
 app = FastAPI(
     title="Support System API",
     description="API for Support Dashboard",
     lifespan=lifespan,
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # Настройка глобальной обработки исключений
 setup_exception_handlers(app)
 
 
+# Admission control: внутри CORS, чтобы отказ 503 тоже получал CORS-заголовки
+app.add_middleware(AdmissionControlMiddleware)
 
 # Настройка CORS
 app.add_middleware(
@@ -38,6 +107,19 @@ app.add_middleware(
 )
 
 
+# Счётчик запросов к БД и заголовок Server-Timing
+app.add_middleware(QueryStatsMiddleware)
+
+# Метрики Prometheus (добавляется последним — внешний слой, видит все запросы)
+app.add_middleware(PrometheusMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Метрики приложения в формате Prometheus"""
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 # Корневая точка с приветственным сообщением
 @app.get("/")
 async def root():
@@ -54,6 +136,22 @@ async def info():
     }
 
 
+@app.get("/health")
+async def health():
+    """Liveness: процесс жив и event loop отвечает"""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: БД доступна и воркер не перегружен (503, если нет)"""
+    is_ready, checks = health_monitor.readiness()
+    return JSONResponse(
+        status_code=200 if is_ready else 503,
+        content={"status": "ready" if is_ready else "not_ready", "checks": checks}
+    )
+
+
 @app.get("/api/status")
 async def api_status():
     return {
@@ -74,8 +172,10 @@ async def config_test():
 
 
 # Подключаем роутеры
-from app.routers import users, auth, admin
+from app.routers import users, auth, admin, tickets, events
 
 app.include_router(users.router, prefix="/api")
 app.include_router(auth.router, prefix="/auth") 
-app.include_router(admin.router, prefix="/api")
\ No newline at end of file
+app.include_router(admin.router, prefix="/api")
+app.include_router(tickets.router, prefix="/api")
+app.include_router(events.router, prefix="/api")
\ No newline at end of file
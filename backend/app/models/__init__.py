@@ -4,5 +4,10 @@ from sqlalchemy.ext.declarative import declarative_base
 Base = declarative_base()
 
 from .user import User
+from .ticket import Ticket
+from .audit import AuditEvent
+from .rollup import TicketRollup
+from .lease import LeaderLease
+from .sla import SlaBreach
 
-__all__ = ["Base", "User"]
\ No newline at end of file
+__all__ = ["Base", "User", "Ticket", "AuditEvent", "TicketRollup", "LeaderLease", "SlaBreach"]
\ No newline at end of file
@@ -0,0 +1,22 @@
+from sqlalchemy import JSON, BigInteger, Column, DateTime, Index, Integer, String
+from . import Base
+
+class AuditEvent(Base):
+    """Событие аудита: входы, регистрации, изменения ролей."""
+    __tablename__ = "audit_events"
+    __table_args__ = (
+        # Keyset-пагинация по id (от новых к старым) с фильтрами журнала
+        Index("ix_audit_events_event_type_id", "event_type", "id"),
+        Index("ix_audit_events_actor_id_id", "actor_id", "id"),
+        Index("ix_audit_events_target_id_id", "target_id", "id"),
+    )
+
+    # BIGINT в MySQL; в SQLite автоинкремент есть только у INTEGER PRIMARY KEY
+    id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    created_at = Column(DateTime, nullable=False)
+    event_type = Column(String(50), nullable=False)   # login_succeeded, login_failed, user_registered, ...
+    actor_id = Column(Integer, nullable=True)         # кто выполнил действие
+    target_id = Column(Integer, nullable=True)        # над каким пользователем
+    email = Column(String(255), nullable=True)
+    ip_address = Column(String(45), nullable=True)
+    details = Column(JSON, nullable=True)
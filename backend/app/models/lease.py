@@ -0,0 +1,10 @@
+from sqlalchemy import Column, DateTime, String
+from . import Base
+
+class LeaderLease(Base):
+    """Аренда лидерства: фоновую задачу выполняет воркер, чья аренда не истекла."""
+    __tablename__ = "leader_leases"
+
+    name = Column(String(50), primary_key=True)      # имя задачи, например sla
+    holder = Column(String(100), nullable=False)     # host:pid:случайный суффикс воркера
+    expires_at = Column(DateTime, nullable=False)    # UTC
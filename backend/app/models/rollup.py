@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, Integer, String
+from . import Base
+
+class TicketRollup(Base):
+    """Счётчик заявок в часовом или дневном интервале (для графиков дашборда)."""
+    __tablename__ = "ticket_rollups"
+
+    # Порядок ключа — под выборку графика: (granularity, metric) и диапазон bucket_start
+    granularity = Column(String(10), primary_key=True)   # hour, day
+    metric = Column(String(20), primary_key=True)        # opened, open, in_progress, resolved, closed
+    bucket_start = Column(DateTime, primary_key=True)    # начало интервала, UTC
+    priority = Column(String(20), primary_key=True)      # low, medium, high, critical
+    count = Column(Integer, nullable=False, default=0)
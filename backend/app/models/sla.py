@@ -0,0 +1,12 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+from . import Base
+
+class SlaBreach(Base):
+    """Нарушение SLA заявки; ключ не даёт зафиксировать одно нарушение дважды."""
+    __tablename__ = "sla_breaches"
+
+    ticket_id = Column(Integer, ForeignKey("tickets.id"), primary_key=True)
+    kind = Column(String(20), primary_key=True)      # response, resolution
+    priority = Column(String(20), nullable=False)
+    deadline = Column(DateTime, nullable=False)
+    breached_at = Column(DateTime, nullable=False)
@@ -0,0 +1,30 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index, func
+from . import Base
+
+class Ticket(Base):
+    """Заявка в службу поддержки."""
+    __tablename__ = "tickets"
+    __table_args__ = (
+        # Составные индексы под фильтры дашборда и keyset-пагинацию (created_at, id)
+        Index("ix_tickets_status_created_at", "status", "created_at", "id"),
+        Index("ix_tickets_status_priority_created_at", "status", "priority", "created_at", "id"),
+        Index("ix_tickets_user_id_created_at", "user_id", "created_at", "id"),
+        Index("ix_tickets_created_at", "created_at", "id"),
+        # Досчитывание SLA: заявки, изменённые после прошлого прохода
+        Index("ix_tickets_updated_at", "updated_at"),
+        # Нагрузка операторов одним GROUP BY assignee_id по индексу
+        Index("ix_tickets_assignee_id_status", "assignee_id", "status"),
+        # Полнотекстовый поиск (только MySQL; в миграции создаётся только на MySQL)
+        Index("ix_tickets_fulltext", "title", "description", mysql_prefix="FULLTEXT"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    status = Column(String(50), default="open")      # open, in_progress, resolved, closed
+    priority = Column(String(20), default="medium")  # low, medium, high, critical
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    assignee_id = Column(Integer, ForeignKey("users.id"), nullable=True)   # оператор, ведущий заявку
+    category = Column(String(50), nullable=True)                            # для подбора оператора по навыкам
+    created_at = Column(DateTime, server_default=func.now())
+    updated_at = Column(DateTime, onupdate=func.now())
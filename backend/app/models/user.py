@@ -10,5 +10,8 @@ class User(Base):
     password = Column(String(255), nullable=False)
     role = Column(String(50), default="user")  # user, operator, manager, admin
     full_name = Column(String(255), nullable=True)
+    skills = Column(String(255), nullable=True)           # категории заявок оператора через запятую (пусто — любые)
+    max_open_tickets = Column(Integer, nullable=True)     # предел активных заявок оператора (пусто — по умолчанию)
+    open_tickets = Column(Integer, nullable=False, default=0, server_default="0")  # активные заявки оператора; предел проверяется при записи
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
\ No newline at end of file
@@ -1,6 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.dependencies import get_current_user
+from app.database import get_read_db
+from app.schemas.audit import AuditEventListResponse
+from app.services.audit import build_audit_query, list_audit_page
+from app.services.assignment import assignment_engine
+from app.services.sla import sla_engine
+from app.services.stats import dashboard_stats
+from app.services.ticket_rollups import rebuild_rollups
 
 
 router = APIRouter()
@@ -17,13 +29,13 @@ async def admin_dashboard(current_user: dict = Depends(get_current_user)):
     """Панель администратора с обзором системы."""
     await require_admin(current_user)
     
+    # Счётчики из памяти, без COUNT(*) на каждый запрос
     return {
         "message": "Admin dashboard",
-        "stats": {
-            "total_users": 150,
-            "active_tickets": 23,
-            "resolved_this_week": 45
-        }
+        **dashboard_stats.snapshot(),
+        # Состояние движка SLA на этом воркере (сроки держит только лидер)
+        "sla": sla_engine.snapshot(),
+        "assignment": assignment_engine.snapshot(),
     }
 
 
@@ -56,4 +68,33 @@ async def admin_system(current_user: dict = Depends(get_current_user)):
             "system_logs",
             "performance_metrics"
         ]
-    }
\ No newline at end of file
+    }
+
+
+@router.get("/admin/audit", response_model=AuditEventListResponse)
+async def admin_audit_log(
+    cursor: Optional[int] = Query(None, description="ID последнего события предыдущей страницы"),
+    limit: int = Query(100, ge=1, le=1000),
+    event_type: Optional[str] = None,
+    actor_id: Optional[int] = None,
+    target_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Журнал аудита от новых событий к старым (только для администратора)."""
+    await require_admin(current_user)
+
+    stmt = build_audit_query(cursor, event_type, actor_id, target_id)
+    return ORJSONResponse(await list_audit_page(db, stmt, limit))
+
+
+@router.post("/admin/ticket-rollups/rebuild")
+async def admin_rebuild_ticket_rollups(
+    since: Optional[datetime] = Query(None, description="Пересчитать с начала этого дня (UTC); по умолчанию — всю историю"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Заполнить интервалы графиков заявок из таблицы tickets (после миграции или для сверки)."""
+    await require_admin(current_user)
+
+    buckets = await rebuild_rollups(since)
+    return {"message": "Ticket rollups rebuilt", "buckets": buckets}
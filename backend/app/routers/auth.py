@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException  
+from fastapi import APIRouter, Depends, HTTPException, Request
 from sqlalchemy.ext.asyncio import AsyncSession 
 from sqlalchemy import select  
 from sqlalchemy.exc import SQLAlchemyError
@@ -6,11 +6,18 @@ from sqlalchemy.exc import SQLAlchemyError
 from app.database import get_db
 from app.models.user import User  
 from app.schemas.user import UserLogin, UserCreate, UserResponse
-from app.core.security import verify_password, create_access_token, hash_password
+from app.services import audit
+from app.services.audit import audit_log
+from app.services.users import create_user_record, get_user, user_etag
+from app.core.security import create_access_token
+from app.core.hashing import password_hasher
+from app.core.responses import conditional_json_response, model_response
+from app.core.config import settings
+from app.core.rate_limit import LoginThrottle, create_rate_limit_backend
 from app.core.dependencies import get_current_user
 from app.core.exceptions import (
     InvalidCredentialsException, 
-    EmailAlreadyExistsException,
+    TooManyRequestsException,
     UserNotFoundException
 )
 
@@ -20,20 +27,51 @@ router = APIRouter()
 # Допустимые роли пользователей для регистрации
 VALID_ROLES = ["user", "operator", "manager", "admin"]
 
+# Ограничение попыток входа (проверяется до обращения к БД и bcrypt)
+login_throttle = LoginThrottle(
+    backend=create_rate_limit_backend(
+        settings.LOGIN_THROTTLE_BACKEND,
+        namespace="login",
+        max_keys=settings.LOGIN_THROTTLE_MAX_KEYS,
+    ),
+    email_per_minute=settings.LOGIN_EMAIL_ATTEMPTS_PER_MINUTE,
+    email_burst=settings.LOGIN_EMAIL_BURST,
+    ip_per_minute=settings.LOGIN_IP_ATTEMPTS_PER_MINUTE,
+    ip_burst=settings.LOGIN_IP_BURST,
+)
+
 
 @router.post("/login")
 async def login(  
     user_data: UserLogin, 
+    request: Request,
     db: AsyncSession = Depends(get_db)  
 ):
     """Аутентифицировать пользователя и вернуть токен доступа JWT."""
+    # Отсечь перебор до поиска в БД и проверки bcrypt
+    client_ip = request.client.host if request.client else None
+    try:
+        await login_throttle.check(user_data.email, client_ip)
+    except TooManyRequestsException:
+        audit_log.record(audit.LOGIN_THROTTLED, email=user_data.email, ip_address=client_ip)
+        raise
+
     # Find user by email
     result = await db.execute(select(User).where(User.email == user_data.email))
     user = result.scalar_one_or_none()
     
     # Verify credentials
-    if not user or not verify_password(user_data.password, user.password):
+    if not user or not await password_hasher.verify(user_data.password, user.password):
+        audit_log.record(
+            audit.LOGIN_FAILED,
+            target_id=user.id if user else None,
+            email=user_data.email,
+            ip_address=client_ip,
+            details={"reason": "wrong_password" if user else "unknown_email"}
+        )
         raise InvalidCredentialsException()
+
+    audit_log.record(audit.LOGIN_SUCCEEDED, actor_id=user.id, target_id=user.id, email=user.email, ip_address=client_ip)
     
     # Генерация токена JWT с данными пользователя
     access_token = create_access_token(
@@ -56,35 +94,35 @@ async def login(
 @router.post("/register", response_model=UserResponse)
 async def register(  
     user_data: UserCreate, 
+    request: Request,
     db: AsyncSession = Depends(get_db)  
 ):
     """регистрация нового юзера"""
-    # Проверить наличие существующего пользователя
-    result = await db.execute(select(User).where(User.email == user_data.email))
-    existing_user = result.scalar_one_or_none()
-    
-    if existing_user:
-        raise EmailAlreadyExistsException()
-    
     # проверка роли
     role = user_data.role or "user"
     if role not in VALID_ROLES:
         raise HTTPException(400, f"Invalid role. Must be one of: {VALID_ROLES}")
     
-    hashed_password = hash_password(user_data.password)
-
-    db_user = User(
-        email=user_data.email,
-        password=hashed_password,
-        full_name=user_data.full_name,
-        role=role
-    )
+    hashed_password = await password_hasher.hash(user_data.password)
 
+    # Занятый email отсекает уникальный индекс (EmailAlreadyExistsException)
     try:
-        db.add(db_user)
-        await db.commit()  
-        await db.refresh(db_user) 
-        return db_user
+        db_user = await create_user_record(
+            db,
+            email=user_data.email,
+            hashed_password=hashed_password,
+            full_name=user_data.full_name,
+            role=role
+        )
+        audit_log.record(
+            audit.USER_REGISTERED,
+            actor_id=db_user.id,
+            target_id=db_user.id,
+            email=db_user.email,
+            ip_address=request.client.host if request.client else None,
+            details={"role": db_user.role}
+        )
+        return model_response(UserResponse.model_validate(db_user))
     except SQLAlchemyError:
         await db.rollback()
         raise HTTPException(500, "Database error during registration")
@@ -92,8 +130,8 @@ async def register(
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(  
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)  
+    request: Request,
+    current_user: dict = Depends(get_current_user)
 ):
     """Получить информацию о текущем авторизованном пользователе."""
     try:
@@ -101,11 +139,10 @@ async def get_current_user_info(
     except (KeyError, ValueError, TypeError):
         raise HTTPException(401, "Invalid token payload")
     
-    # Получить свежие данные пользователя из базы данных
-    result = await db.execute(select(User).where(User.id == user_id))  
-    user = result.scalar_one_or_none()
+    # Получить данные пользователя (из кэша или базы данных)
+    user = await get_user(user_id)
 
     if not user:
         raise UserNotFoundException()
     
-    return user
\ No newline at end of file
+    return conditional_json_response(request, user, user_etag(user))
\ No newline at end of file
@@ -0,0 +1,133 @@
+import asyncio
+from typing import Optional, Set
+
+import orjson
+from fastapi import APIRouter, Depends, Query, WebSocket
+from fastapi.responses import StreamingResponse
+from starlette.websockets import WebSocketDisconnect
+
+from app.core.config import settings
+from app.core.dependencies import authenticate_token, get_current_user, get_stream_user
+from app.core.events import (
+    TOPIC_MY_TICKETS,
+    SubscriptionClosed,
+    allowed_topics,
+    event_hub,
+    user_channel
+)
+from app.core.exceptions import BaseAPIException, ForbiddenException, ServiceUnavailableException
+from app.core.security import STREAM_TOKEN_SCOPE, create_stream_token
+
+
+router = APIRouter()
+
+# Коды закрытия WebSocket (RFC 6455)
+WS_POLICY_VIOLATION = 1008
+WS_GOING_AWAY = 1001
+WS_TRY_AGAIN_LATER = 1013
+
+
+def resolve_channels(current_user: dict, topics: Optional[str]) -> Set[str]:
+    """Каналы подписки по запрошенным топикам и роли (по умолчанию — все доступные)"""
+    allowed = allowed_topics(current_user.get("role"))
+    requested = {topic.strip() for topic in topics.split(",") if topic.strip()} if topics else allowed
+
+    forbidden = requested - allowed
+    if forbidden:
+        raise ForbiddenException(detail=f"Topics not allowed: {', '.join(sorted(forbidden))}")
+
+    return {
+        user_channel(int(current_user["sub"])) if topic == TOPIC_MY_TICKETS else topic
+        for topic in requested
+    }
+
+
+@router.post("/events/token")
+async def stream_token(current_user: dict = Depends(get_current_user)):
+    """Короткоживущий токен для ?token= в SSE и WebSocket: основной JWT не попадает в логи доступа"""
+    return {
+        "token": create_stream_token(current_user),
+        "expires_in": settings.EVENT_STREAM_TOKEN_SECONDS,
+    }
+
+
+@router.get("/events/stream")
+async def event_stream(
+    topics: Optional[str] = Query(None, description="Топики через запятую: tickets, my_tickets, audit"),
+    current_user: dict = Depends(get_stream_user)
+):
+    """Server-Sent Events: события дашборда вместо опроса REST."""
+    channels = resolve_channels(current_user, topics)
+    if event_hub.subscriber_count >= event_hub.max_subscribers:
+        raise ServiceUnavailableException(detail="Too many event subscribers")
+
+    async def stream():
+        # Подписка — в генераторе: если клиент ушёл до первой итерации, finally не выполнится
+        subscription = event_hub.subscribe(channels)
+        if subscription is None:
+            # Места заняли между проверкой и началом ответа
+            yield b"event: closed\ndata: " + orjson.dumps({"reason": "too_many_subscribers"}) + b"\n\n"
+            return
+        try:
+            # Переподключение EventSource через 5 секунд
+            yield b"retry: 5000\n\n"
+            while True:
+                try:
+                    message = await subscription.get(settings.EVENT_HEARTBEAT_SECONDS)
+                except SubscriptionClosed as exc:
+                    yield b"event: closed\ndata: " + orjson.dumps({"reason": exc.reason}) + b"\n\n"
+                    return
+                # Комментарий-пинг держит соединение через прокси и выявляет отключившихся
+                yield message.sse if message is not None else b": ping\n\n"
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/events/ws")
+async def event_socket(
+    websocket: WebSocket,
+    token: Optional[str] = None,
+    topics: Optional[str] = None
+):
+    """WebSocket с теми же событиями; токен подписки передается в ?token= (браузер не шлёт заголовки)."""
+    try:
+        channels = resolve_channels(authenticate_token(token, STREAM_TOKEN_SCOPE), topics)
+    except BaseAPIException as exc:
+        await websocket.close(code=WS_POLICY_VIOLATION, reason=exc.detail)
+        return
+
+    subscription = event_hub.subscribe(channels)
+    if subscription is None:
+        await websocket.close(code=WS_TRY_AGAIN_LATER, reason="Too many event subscribers")
+        return
+
+    await websocket.accept()
+
+    async def watch_disconnect():
+        # Входящие сообщения не нужны, но только чтение замечает закрытие сокета клиентом
+        try:
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                pass
+        finally:
+            subscription.close("disconnected")
+
+    watcher = asyncio.ensure_future(watch_disconnect())
+    try:
+        while True:
+            message = await subscription.get(settings.EVENT_HEARTBEAT_SECONDS)
+            await websocket.send_text(message.text if message is not None else '{"type":"ping"}')
+    except SubscriptionClosed as exc:
+        if exc.reason != "disconnected":
+            code = WS_TRY_AGAIN_LATER if exc.reason == "slow_consumer" else WS_GOING_AWAY
+            await websocket.close(code=code, reason=exc.reason)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        watcher.cancel()
+        event_hub.unsubscribe(subscription)
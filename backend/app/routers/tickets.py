@@ -0,0 +1,181 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.database import get_db, get_read_db
+from app.schemas.ticket import (
+    TicketCreate,
+    TicketUpdate,
+    TicketResponse,
+    TicketListResponse,
+    TicketStatus,
+    TicketPriority
+)
+from app.schemas.rollup import TicketMetric, TicketTimeseriesResponse, TimeseriesInterval
+from app.services.assignment import require_operator
+from app.services.ticket_rollups import ticket_timeseries
+from app.services.ticket_search import search_tickets
+from app.services.tickets import (
+    build_ticket_list_query,
+    list_tickets,
+    get_ticket,
+    create_ticket,
+    update_ticket
+)
+from app.core.dependencies import get_current_user, require_operator_or_admin
+from app.core.exceptions import TicketNotFoundException, ForbiddenException
+from app.core.responses import model_response
+from app.core.security import STAFF_ROLES
+
+
+router = APIRouter()
+
+
+@router.post("/tickets", response_model=TicketResponse)
+async def create_new_ticket(
+    ticket_data: TicketCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Создать заявку от имени текущего пользователя"""
+    try:
+        ticket = await create_ticket(db, int(current_user["sub"]), ticket_data)
+    except SQLAlchemyError:
+        await db.rollback()
+        raise HTTPException(500, "Database error during ticket creation")
+
+    return model_response(TicketResponse.model_validate(ticket))
+
+
+@router.get("/tickets", response_model=TicketListResponse)
+async def get_tickets(
+    status: Optional[TicketStatus] = None,
+    priority: Optional[TicketPriority] = None,
+    user_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Список заявок с фильтрами и keyset-пагинацией.
+
+    Обычный пользователь видит только свои заявки.
+    """
+    if current_user.get("role") not in STAFF_ROLES:
+        user_id = int(current_user["sub"])
+
+    stmt = build_ticket_list_query(
+        status=status.value if status else None,
+        priority=priority.value if priority else None,
+        user_id=user_id,
+        created_from=created_from,
+        created_to=created_to,
+        cursor=cursor,
+    )
+    items, next_cursor = await list_tickets(db, stmt, limit)
+    return model_response(TicketListResponse.model_validate(
+        {"items": items, "next_cursor": next_cursor},
+        from_attributes=True
+    ))
+
+
+@router.get("/tickets/search", response_model=TicketListResponse)
+async def search_tickets_by_text(
+    q: str = Query(..., min_length=1, max_length=200, description="Слова для поиска в title и description"),
+    status: Optional[TicketStatus] = None,
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor предыдущей страницы"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Полнотекстовый поиск заявок, самые релевантные сверху.
+
+    Обычный пользователь ищет только по своим заявкам.
+    """
+    user_id = None
+    if current_user.get("role") not in STAFF_ROLES:
+        user_id = int(current_user["sub"])
+
+    items, next_cursor = await search_tickets(
+        db,
+        q,
+        status=status.value if status else None,
+        user_id=user_id,
+        cursor=cursor,
+        limit=limit,
+    )
+    return model_response(TicketListResponse.model_validate(
+        {"items": items, "next_cursor": next_cursor},
+        from_attributes=True
+    ))
+
+
+@router.get("/tickets/timeseries", response_model=TicketTimeseriesResponse)
+async def get_ticket_timeseries(
+    start: datetime = Query(..., alias="from", description="Начало периода (UTC)"),
+    end: datetime = Query(..., alias="to", description="Конец периода (UTC), не включительно"),
+    metric: List[TicketMetric] = Query([TicketMetric.OPENED, TicketMetric.RESOLVED]),
+    interval: Optional[TimeseriesInterval] = Query(None, description="Шаг точек; по умолчанию — самый мелкий в пределах лимита точек"),
+    priority: Optional[TicketPriority] = None,
+    by_priority: bool = Query(False, description="Отдельный ряд на каждый приоритет"),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(require_operator_or_admin)
+):
+    """Графики заявок (создано, решено и т.д.) из предрасчитанных интервалов"""
+    data = await ticket_timeseries(
+        db,
+        start,
+        end,
+        metrics=list(dict.fromkeys(item.value for item in metric)),
+        interval=interval.value if interval else None,
+        priority=priority.value if priority else None,
+        by_priority=by_priority,
+    )
+    return ORJSONResponse(data)
+
+
+@router.get("/tickets/{ticket_id}", response_model=TicketResponse)
+async def get_ticket_by_id(
+    ticket_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Получить заявку по ID (автор или персонал)"""
+    ticket = await get_ticket(db, ticket_id)
+    if not ticket:
+        raise TicketNotFoundException()
+
+    if current_user.get("role") not in STAFF_ROLES and ticket.user_id != int(current_user["sub"]):
+        raise ForbiddenException(detail="Access to this ticket is not allowed")
+
+    return model_response(TicketResponse.model_validate(ticket))
+
+
+@router.patch("/tickets/{ticket_id}", response_model=TicketResponse)
+async def update_ticket_by_id(
+    ticket_id: int,
+    ticket_data: TicketUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(require_operator_or_admin)
+):
+    """Обновить заявку (оператор или администратор)"""
+    if ticket_data.assignee_id is not None:
+        await require_operator(ticket_data.assignee_id)
+
+    ticket = await get_ticket(db, ticket_id)
+    if not ticket:
+        raise TicketNotFoundException()
+
+    try:
+        ticket = await update_ticket(db, ticket, ticket_data)
+    except SQLAlchemyError:
+        await db.rollback()
+        raise HTTPException(500, "Database error during ticket update")
+
+    return model_response(TicketResponse.model_validate(ticket))
@@ -1,15 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession  
-from sqlalchemy import select  
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.database import get_db
-from app.models.user import User
-from app.schemas.user import UserCreate, UserResponse, UserUpdate
-from app.core.security import hash_password 
-from app.core.dependencies import get_current_user
+from app.database import get_db, get_read_db
+from app.schemas.user import (
+    UserCreate,
+    UserResponse,
+    UserUpdate,
+    UserListResponse,
+    UserBatchResponse,
+    UserRole,
+    RoleUpdateResponse,
+    OperatorAssignmentUpdate,
+    OperatorAssignmentResponse
+)
+from app.services import audit
+from app.services.assignment import assignment_engine, update_operator_settings
+from app.services.audit import audit_log
+from app.services.user_import import ImportReport, detect_import_format, import_users
+from app.services.users import (
+    create_user_record,
+    get_user,
+    set_user_role,
+    user_etag,
+    build_user_list_query,
+    list_users_page,
+    stream_users_ndjson
+)
+from app.core.hashing import password_hasher
+from app.core.responses import conditional_json_response, model_response
+from app.core.config import settings
+from app.core.dataloader import DataLoader
+from app.core.dependencies import get_current_user, get_user_loader
 from app.core.exceptions import ( 
-    EmailAlreadyExistsException,
+    InvalidIdListException,
     UserNotFoundException
 )
 
@@ -20,86 +48,155 @@ router = APIRouter()
 @router.post("/users", response_model=UserResponse)
 async def create_user(
     user_data: UserCreate, 
+    request: Request,
     db: AsyncSession = Depends(get_db)
 ): 
     """создать нового юзера"""
-    # Проверить, существует ли пользователь
-    result = await db.execute(select(User).where(User.email == user_data.email)) 
-    existing_user = result.scalar_one_or_none()
-    
-    if existing_user:
-        raise EmailAlreadyExistsException()  
-    
-    # Создать нового пользователя с хэшированным паролем
-    hashed_password = hash_password(user_data.password)  
-    
-    db_user = User(
-        email=user_data.email,
-        password=hashed_password,
-        full_name=user_data.full_name,
-        role=user_data.role or "user"
-    )
+    # Создать нового пользователя с хэшированным паролем;
+    # занятый email отсекает уникальный индекс (EmailAlreadyExistsException)
+    hashed_password = await password_hasher.hash(user_data.password)
     
     try:
-        db.add(db_user)
-        await db.commit()  
-        await db.refresh(db_user)  
-        return db_user
+        db_user = await create_user_record(
+            db,
+            email=user_data.email,
+            hashed_password=hashed_password,
+            full_name=user_data.full_name,
+            role=user_data.role or "user"
+        )
+        audit_log.record(
+            audit.USER_CREATED,
+            target_id=db_user.id,
+            email=db_user.email,
+            ip_address=request.client.host if request.client else None,
+            details={"role": db_user.role}
+        )
+        return model_response(UserResponse.model_validate(db_user))
     except SQLAlchemyError:
         await db.rollback()
         raise HTTPException(500, "Database error during user creation")
 
 
+@router.get("/users", response_model=UserBatchResponse)
+async def get_users_batch(
+    ids: str = Query(..., description="ID пользователей через запятую"),
+    loader: DataLoader = Depends(get_user_loader),
+    current_user: dict = Depends(get_current_user)
+):
+    """Получить пользователей по списку ID одним запросом к БД."""
+    try:
+        user_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise InvalidIdListException()
+
+    if not user_ids:
+        raise InvalidIdListException()
+    if len(user_ids) > settings.USER_BATCH_MAX_IDS:
+        raise InvalidIdListException(detail=f"At most {settings.USER_BATCH_MAX_IDS} ids per request")
+
+    users = await loader.load_many(user_ids)
+    return ORJSONResponse({
+        "items": [user for user in users if user is not None],
+        "missing": [user_id for user_id, user in zip(user_ids, users) if user is None],
+    })
+
+
 @router.get("/users/me", response_model=UserResponse)  
 async def get_current_user_info(
-    current_user: dict = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)  
+    request: Request,
+    current_user: dict = Depends(get_current_user)
 ):  
     """Получить информацию о текущем авторизованном пользователе."""
     user_id = int(current_user["sub"]) # Текущие данные пользователя
     
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    user = await get_user(user_id)
     
     if not user:
         raise UserNotFoundException()   #  если пользователь больше не существует в базе данных
     
-    return user  
+    # Запись из кэша уже в JSON-виде — сразу в orjson, без повторной валидации
+    return conditional_json_response(request, user, user_etag(user))
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
 async def get_user_by_id(
     user_id: int,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
     current_user: dict = Depends(get_current_user)
 ):
     """Получить пользователя по ID (требуется аутентификация)."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
+    # Промах кэша читает primary: запись с отстающей реплики попала бы в общий кэш.
+    # Одновременные промахи по одному id делят один запрос (single-flight)
+    user = await get_user(user_id)
     
     if not user:
         raise UserNotFoundException()
     
-    return user
+    return conditional_json_response(request, user, user_etag(user))
 
 
 # АДМИН ЭНДПОИНТЫ
-@router.get("/admin/users")
+@router.get("/admin/users", response_model=UserListResponse)
 async def get_all_users(
-    db: AsyncSession = Depends(get_db),
+    cursor: Optional[int] = Query(None, description="ID последнего пользователя предыдущей страницы"),
+    limit: int = Query(100, ge=1, le=1000),
+    role: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    stream: bool = Query(False, description="Отдать всю выборку потоком NDJSON"),
+    db: AsyncSession = Depends(get_read_db),
     current_user: dict = Depends(get_current_user) 
 ):
-    """Получить всех пользователей (только для администратора)"""
+    """Получить пользователей постранично (только для администратора)"""
     # Проверить, является ли текущий пользователь администратором
     if current_user.get("role") != "admin":
         raise HTTPException(403, "Admin access required")
     
-    result = await db.execute(select(User))
-    users = result.scalars().all()
-    return users
+    stmt = build_user_list_query(cursor, role, created_from, created_to)
+
+    if stream:
+        return StreamingResponse(stream_users_ndjson(stmt), media_type="application/x-ndjson")
+
+    # Строки уже без пароля — сериализуем напрямую, минуя jsonable_encoder
+    return ORJSONResponse(await list_users_page(db, stmt, limit))
+
 
+@router.post("/admin/users/import")
+async def import_users_file(
+    file: UploadFile = File(..., description="CSV с заголовком или NDJSON: email, password, full_name, role"),
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Массовый импорт пользователей (только для администратора).
+
+    Возвращает построчный отчёт в NDJSON, итоги — в заголовках X-Import-*.
+    """
+    if current_user.get("role") != "admin":
+        raise HTTPException(403, "Admin access required")
 
-@router.patch("/admin/users/{user_id}/role")
+    fmt = detect_import_format(file.filename, file.content_type)
+    report = ImportReport()
+    try:
+        await import_users(db, file.file, fmt, report)
+    except SQLAlchemyError:
+        report.close()
+        await db.rollback()
+        raise HTTPException(500, "Database error during user import")
+
+    audit_log.record(
+        audit.USERS_IMPORTED,
+        actor_id=int(current_user["sub"]),
+        details={"file": file.filename, **report.counts}
+    )
+
+    return StreamingResponse(
+        report.iter_bytes(),
+        media_type="application/x-ndjson",
+        headers=report.summary_headers()
+    )
+
+
+@router.patch("/admin/users/{user_id}/role", response_model=RoleUpdateResponse)
 async def update_user_role(
     user_id: int,
     role_data: dict,
@@ -112,24 +209,46 @@ async def update_user_role(
         raise HTTPException(403, "Admin access required")
     
     # Подтвердить роль
-    valid_roles = ["user", "admin"]
+    valid_roles = [role.value for role in UserRole]
     new_role = role_data.get("role")
     if new_role not in valid_roles:
         raise HTTPException(400, f"Invalid role. Must be one of: {valid_roles}")
     
-    # Найти и обновить пользователя
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    
-    if not user:
-        raise UserNotFoundException()
-    
+    # Обновить одним UPDATE; отсутствие строки -> UserNotFoundException
     try:
-        user.role = new_role
-        await db.commit()
-        await db.refresh(user)
+        user = await set_user_role(db, user_id, new_role)
+        await assignment_engine.role_changed(user_id, new_role)
+        audit_log.record(
+            audit.USER_ROLE_CHANGED,
+            actor_id=int(current_user["sub"]),
+            target_id=user_id,
+            email=user["email"],
+            details={"role": new_role}
+        )
         
-        return {"message": f"Role updated to {user.role}", "user": user}
+        return model_response(RoleUpdateResponse(
+            message=f"Role updated to {new_role}",
+            user=UserResponse.model_validate(user)
+        ))
     except SQLAlchemyError:
         await db.rollback()
-        raise HTTPException(500, "Database error during role update")
\ No newline at end of file
+        raise HTTPException(500, "Database error during role update")
+
+@router.patch("/admin/users/{user_id}/assignment", response_model=OperatorAssignmentResponse)
+async def update_operator_assignment(
+    user_id: int,
+    data: OperatorAssignmentUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: dict = Depends(get_current_user)
+):
+    """Навыки и предел активных заявок оператора для автоназначения (только для админа)"""
+    if current_user.get("role") != "admin":
+        raise HTTPException(403, "Admin access required")
+
+    try:
+        result = await update_operator_settings(db, user_id, data.skills, data.max_open_tickets)
+    except SQLAlchemyError:
+        await db.rollback()
+        raise HTTPException(500, "Database error during operator update")
+
+    return model_response(OperatorAssignmentResponse(**result))
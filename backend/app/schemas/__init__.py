@@ -1,4 +1,24 @@
-from .user import UserCreate, UserResponse, UserUpdate, UserLogin
+from .user import (
+    UserCreate,
+    UserResponse,
+    UserUpdate,
+    UserLogin,
+    UserListResponse,
+    UserBatchResponse,
+    RoleUpdateResponse,
+    OperatorAssignmentUpdate,
+    OperatorAssignmentResponse,
+)
+from .audit import AuditEventResponse, AuditEventListResponse
+from .ticket import (
+    TicketCreate,
+    TicketUpdate,
+    TicketResponse,
+    TicketListResponse,
+    TicketStatus,
+    TicketPriority,
+)
+from .rollup import TicketMetric, TimeseriesInterval, TicketTimeseries, TicketTimeseriesResponse
 
 __all__ = [
     # User схема
@@ -6,4 +26,24 @@ __all__ = [
     "UserResponse", 
     "UserUpdate", 
     "UserLogin",
-]
\ No newline at end of file
+    "UserListResponse",
+    "UserBatchResponse",
+    "RoleUpdateResponse",
+    "OperatorAssignmentUpdate",
+    "OperatorAssignmentResponse",
+    # Ticket схема
+    "TicketCreate",
+    "TicketUpdate",
+    "TicketResponse",
+    "TicketListResponse",
+    "TicketStatus",
+    "TicketPriority",
+    # Графики заявок
+    "TicketMetric",
+    "TimeseriesInterval",
+    "TicketTimeseries",
+    "TicketTimeseriesResponse",
+    # Audit схема
+    "AuditEventResponse",
+    "AuditEventListResponse",
+]
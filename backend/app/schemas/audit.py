@@ -0,0 +1,24 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+
+class AuditEventResponse(BaseModel):
+    """Событие журнала аудита"""
+    id: int
+    created_at: datetime
+    event_type: str
+    actor_id: Optional[int]
+    target_id: Optional[int]
+    email: Optional[str]
+    ip_address: Optional[str]
+    details: Optional[Dict[str, Any]]
+
+    class Config:
+        from_attributes = True
+
+
+class AuditEventListResponse(BaseModel):
+    """Страница журнала аудита с курсором на следующую"""
+    items: List[AuditEventResponse]
+    next_cursor: Optional[int]
@@ -0,0 +1,43 @@
+from enum import Enum
+from pydantic import BaseModel
+from datetime import datetime
+from typing import List, Optional
+
+from .ticket import TicketPriority
+
+
+class TicketMetric(str, Enum):
+    """Метрики графиков: создание заявки или переход в статус"""
+    OPENED = "opened"
+    OPEN = "open"
+    IN_PROGRESS = "in_progress"
+    RESOLVED = "resolved"
+    CLOSED = "closed"
+
+
+class TimeseriesInterval(str, Enum):
+    """Шаг точек графика"""
+    HOUR = "1h"
+    HOURS_3 = "3h"
+    HOURS_6 = "6h"
+    HOURS_12 = "12h"
+    DAY = "1d"
+    WEEK = "7d"
+    MONTH = "30d"
+
+
+class TicketTimeseries(BaseModel):
+    """Ряд счётчиков одной метрики (и приоритета, если запрошена разбивка)"""
+    metric: TicketMetric
+    priority: Optional[TicketPriority]
+    counts: List[int]
+
+
+class TicketTimeseriesResponse(BaseModel):
+    """Ряды графика: counts[i] относится к интервалу, начинающемуся в timestamps[i]"""
+    interval: TimeseriesInterval
+    granularity: str
+    start: datetime
+    end: datetime
+    timestamps: List[datetime]
+    series: List[TicketTimeseries]
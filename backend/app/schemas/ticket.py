@@ -0,0 +1,61 @@
+from enum import Enum
+from pydantic import BaseModel, Field
+from datetime import datetime
+from typing import List, Optional
+
+
+class TicketStatus(str, Enum):
+    """Статусы заявки"""
+    OPEN = "open"
+    IN_PROGRESS = "in_progress"
+    RESOLVED = "resolved"
+    CLOSED = "closed"
+
+
+class TicketPriority(str, Enum):
+    """Приоритеты заявки"""
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+    CRITICAL = "critical"
+
+
+class TicketCreate(BaseModel):
+    """Схема создания заявки"""
+    title: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+    priority: TicketPriority = Field(default=TicketPriority.MEDIUM)
+    category: Optional[str] = Field(None, max_length=50, description="Категория для подбора оператора по навыкам")
+
+
+class TicketUpdate(BaseModel):
+    """Схема обновления заявки (только переданные поля)"""
+    title: Optional[str] = Field(None, min_length=1, max_length=255)
+    description: Optional[str] = None
+    status: Optional[TicketStatus] = None
+    priority: Optional[TicketPriority] = None
+    category: Optional[str] = Field(None, max_length=50)
+    assignee_id: Optional[int] = Field(None, description="Назначить оператора вручную; null снимает исполнителя")
+
+
+class TicketResponse(BaseModel):
+    """Схема заявки в ответах API"""
+    id: int
+    title: str
+    description: Optional[str]
+    status: TicketStatus
+    priority: TicketPriority
+    user_id: Optional[int]
+    assignee_id: Optional[int] = None
+    category: Optional[str] = None
+    created_at: datetime
+    updated_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True  # Совместимость с объектами ORM SQLAlchemy
+
+
+class TicketListResponse(BaseModel):
+    """Страница списка заявок с курсором на следующую"""
+    items: List[TicketResponse]
+    next_cursor: Optional[str]
@@ -1,12 +1,14 @@
 from enum import Enum
 from pydantic import BaseModel, EmailStr, Field, field_validator
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
 
 class UserRole(str, Enum):
     """Допустимые роли пользователей в системе"""
     USER = "user"
+    OPERATOR = "operator"
+    MANAGER = "manager"
     ADMIN = "admin"
 
 
@@ -49,6 +51,38 @@ class UserResponse(BaseModel):
         from_attributes = True  # Совместимость с объектами ORM SQLAlchemy
 
 
+class UserListResponse(BaseModel):
+    """Страница списка пользователей с курсором на следующую"""
+    items: List[UserResponse]
+    next_cursor: Optional[int]
+
+
+class UserBatchResponse(BaseModel):
+    """Пользователи по списку id (в порядке запроса) и id, которых нет"""
+    items: List[UserResponse]
+    missing: List[int]
+
+
+class RoleUpdateResponse(BaseModel):
+    """Результат смены роли пользователя"""
+    message: str
+    user: UserResponse
+
+
+class OperatorAssignmentUpdate(BaseModel):
+    """Навыки и предел нагрузки оператора для автоназначения"""
+    skills: List[str] = Field(default_factory=list, description="Категории заявок; пустой список — любые")
+    max_open_tickets: Optional[int] = Field(None, ge=0, description="Пусто — значение по умолчанию")
+
+
+class OperatorAssignmentResponse(BaseModel):
+    """Настройки автоназначения оператора и его текущая нагрузка"""
+    user_id: int
+    skills: List[str]
+    max_open_tickets: int
+    load: int
+
+
 class UserLogin(BaseModel):
     """Схема для аутентификации пользователя."""
     email: EmailStr
@@ -0,0 +1,523 @@
+# app/services/assignment.py
+import asyncio
+import heapq
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.events import TOPIC_TICKETS, event_hub
+from app.core.exceptions import InvalidAssigneeException, UserNotFoundException
+from app.core.metrics import (
+    ASSIGNMENT_DECISION_SECONDS,
+    ASSIGNMENT_QUEUE_DEPTH,
+    ASSIGNMENT_WAIT_SECONDS,
+    ASSIGNMENTS,
+)
+from app.database import AsyncSessionLocal
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.services.stats import ACTIVE_STATUSES
+from app.services.users import get_user, invalidate_user
+
+logger = logging.getLogger(__name__)
+
+OPERATOR_ROLE = "operator"
+
+# Ключи куч: все операторы (для заявок без категории) и операторы без навыков (берут любые)
+ANY_CATEGORY = "*"
+GENERALISTS = ""
+
+ASSIGNED_EVENT = "ticket.assigned"
+
+# Сколько кандидатов пробовать для новой заявки, если место в БД уже занято
+CLAIM_ATTEMPTS = 3
+
+
+def normalize_category(value: Optional[str]) -> Optional[str]:
+    value = (value or "").strip().lower()
+    return value or None
+
+
+def parse_skills(value: Optional[str]) -> Set[str]:
+    """Навыки из users.skills ("billing,network")"""
+    return {skill for skill in (normalize_category(item) for item in (value or "").split(",")) if skill}
+
+
+class OperatorState:
+    """Нагрузка и настройки оператора; version отличает актуальную запись в кучах"""
+
+    __slots__ = ("id", "skills", "cap", "load", "version")
+
+    def __init__(self, operator_id: int, skills: Set[str], cap: int, load: int = 0):
+        self.id = operator_id
+        self.skills = skills
+        self.cap = cap
+        self.load = load
+        self.version = 0
+
+    def heap_keys(self) -> Iterable[str]:
+        yield ANY_CATEGORY
+        if self.skills:
+            yield from self.skills
+        else:
+            yield GENERALISTS
+
+
+class AssignmentEngine:
+    """Автоназначение заявок наименее загруженному оператору.
+
+    Нагрузка операторов (активные заявки) хранится в памяти: на каждый навык —
+    куча (load, operator_id). Изменение нагрузки добавляет новую запись,
+    а старые отбрасываются по version, когда доходят до вершины. Оператор
+    на пределе в кучи не попадает, поэтому выбор — O(log n) без COUNT(*).
+
+    Память только подсказывает кандидата, предел проверяет БД: место занимает
+    условный UPDATE счётчика users.open_tickets в транзакции заявки, поэтому
+    воркеры вместе не выдадут оператору больше предела. Если места в БД уже
+    нет (его заняли заявки других воркеров), оператор до сверки считается
+    заполненным.
+
+    Заявки без подходящего оператора ждут в очереди и назначаются фоновой
+    задачей пачками, когда у кого-то освобождается место. Периодическая
+    сверка (один GROUP BY по tickets) обновляет нагрузку в памяти и чинит
+    счётчики после прямых правок в БД.
+    """
+
+    COMPACT_MIN_SIZE = 1024
+
+    def __init__(self, default_cap: int, pending_max: int):
+        self.default_cap = default_cap
+        self.pending_max = pending_max
+        self.active = False
+        self.reconciled_at: Optional[datetime] = None
+        self._operators: Dict[int, OperatorState] = {}
+        self._heaps: Dict[str, List[Tuple[int, int, int]]] = {}
+        self._pending: Dict[str, Deque[Tuple[int, datetime]]] = {}
+        self._pending_ids: Set[int] = set()
+        self._wakeup: Optional[asyncio.Event] = None
+
+    @property
+    def pending_count(self) -> int:
+        return len(self._pending_ids)
+
+    def _push(self, operator: OperatorState) -> None:
+        operator.version += 1
+        if operator.load >= operator.cap:
+            return
+        entry = (operator.load, operator.id, operator.version)
+        for key in operator.heap_keys():
+            heap = self._heaps.setdefault(key, [])
+            heapq.heappush(heap, entry)
+            if len(heap) > self.COMPACT_MIN_SIZE and len(heap) > 2 * len(self._operators):
+                self._heaps[key] = heap = [item for item in heap if self._is_current(item)]
+                heapq.heapify(heap)
+
+    def _is_current(self, entry: Tuple[int, int, int]) -> bool:
+        operator = self._operators.get(entry[1])
+        return operator is not None and operator.version == entry[2]
+
+    def _top(self, key: str) -> Optional[OperatorState]:
+        heap = self._heaps.get(key)
+        while heap:
+            if self._is_current(heap[0]):
+                return self._operators[heap[0][1]]
+            heapq.heappop(heap)
+        return None
+
+    def _pick(self, category: Optional[str]) -> Optional[OperatorState]:
+        if category is None:
+            return self._top(ANY_CATEGORY)
+        candidates = [op for op in (self._top(category), self._top(GENERALISTS)) if op is not None]
+        return min(candidates, key=lambda op: (op.load, op.id), default=None)
+
+    def _reserve(self, category: Optional[str]) -> Optional[int]:
+        operator = self._pick(category)
+        if operator is None:
+            return None
+        operator.load += 1
+        self._push(operator)
+        return operator.id
+
+    def _mark_full(self, operator_id: int) -> None:
+        operator = self._operators.get(operator_id)
+        if operator is not None:
+            operator.load = max(operator.load, operator.cap)
+            self._push(operator)
+
+    def _cap(self):
+        return func.coalesce(User.max_open_tickets, self.default_cap)
+
+    def choose(self, category: Optional[str]) -> Optional[int]:
+        """Оператор для новой заявки (его нагрузка сразу увеличивается) или None"""
+        if not self.active:
+            return None
+        started = time.perf_counter()
+        operator_id = self._reserve(normalize_category(category))
+        ASSIGNMENT_DECISION_SECONDS.observe(time.perf_counter() - started)
+        return operator_id
+
+    async def claim(self, db: AsyncSession, category: Optional[str]) -> Optional[int]:
+        """Оператор для новой заявки с занятым в БД местом (в транзакции db) или None"""
+        for _ in range(CLAIM_ATTEMPTS):
+            operator_id = self.choose(category)
+            if operator_id is None:
+                return None
+            try:
+                result = await db.execute(
+                    update(User)
+                    .where(User.id == operator_id, User.role == OPERATOR_ROLE, User.open_tickets < self._cap())
+                    .values(open_tickets=User.open_tickets + 1)
+                    .execution_options(synchronize_session=False)
+                )
+            except Exception:
+                self.adjust(operator_id, -1)
+                raise
+            if result.rowcount:
+                return operator_id
+            ASSIGNMENTS.labels("full").inc()
+            self._mark_full(operator_id)
+        return None
+
+    def assigned(self, ticket: Ticket) -> None:
+        """Новая заявка записана с исполнителем"""
+        ASSIGNMENTS.labels("assigned").inc()
+        ASSIGNMENT_WAIT_SECONDS.observe(max(0.0, (datetime.utcnow() - ticket.created_at).total_seconds()))
+
+    def adjust(self, operator_id: Optional[int], delta: int) -> None:
+        operator = self._operators.get(operator_id)
+        if operator is None:
+            return
+        operator.load = max(0, operator.load + delta)
+        self._push(operator)
+        if delta < 0 and self._pending and self._wakeup is not None:
+            self._wakeup.set()
+
+    def enqueue(self, ticket_id: int, category: Optional[str], created_at: datetime) -> None:
+        """Заявка ждёт оператора; сверх pending_max её подберёт следующая сверка"""
+        if not self.active or ticket_id in self._pending_ids or len(self._pending_ids) >= self.pending_max:
+            return
+        self._pending.setdefault(normalize_category(category) or ANY_CATEGORY, deque()).append((ticket_id, created_at))
+        self._pending_ids.add(ticket_id)
+        ASSIGNMENTS.labels("queued").inc()
+
+    @staticmethod
+    def _load_changes(ticket: Ticket, old_assignee_id: Optional[int], old_status: Optional[str]) -> Dict[int, int]:
+        changes: Dict[int, int] = {}
+        if old_assignee_id is not None and old_status in ACTIVE_STATUSES:
+            changes[old_assignee_id] = -1
+        if ticket.assignee_id is not None and ticket.status in ACTIVE_STATUSES:
+            changes[ticket.assignee_id] = changes.get(ticket.assignee_id, 0) + 1
+        return {operator_id: delta for operator_id, delta in changes.items() if delta}
+
+    async def move_load(
+        self,
+        db: AsyncSession,
+        ticket: Ticket,
+        old_assignee_id: Optional[int],
+        old_status: Optional[str],
+    ) -> None:
+        """Переносит счётчики активных заявок в транзакции правки; ручное назначение предел не проверяет"""
+        for operator_id, delta in self._load_changes(ticket, old_assignee_id, old_status).items():
+            await db.execute(
+                update(User)
+                .where(User.id == operator_id)
+                .values(open_tickets=case((User.open_tickets + delta > 0, User.open_tickets + delta), else_=0))
+                .execution_options(synchronize_session=False)
+            )
+
+    def ticket_changed(
+        self,
+        ticket: Ticket,
+        old_assignee_id: Optional[int],
+        old_status: Optional[str],
+    ) -> None:
+        """Учитывает смену исполнителя или статуса после записи заявки"""
+        for operator_id, delta in self._load_changes(ticket, old_assignee_id, old_status).items():
+            self.adjust(operator_id, delta)
+        # Открытая заявка без исполнителя — после переоткрытия или снятия оператора — ждёт нового
+        if ticket.assignee_id is None and ticket.status == "open" and (
+            old_status not in ACTIVE_STATUSES or old_assignee_id is not None
+        ):
+            self.enqueue(ticket.id, ticket.category, ticket.created_at)
+
+    def configure_operator(self, operator_id: int, skills: Set[str], cap: int) -> OperatorState:
+        """Новые навыки и предел оператора; нагрузка сохраняется"""
+        operator = self._operators.get(operator_id)
+        if operator is None:
+            operator = self._operators[operator_id] = OperatorState(operator_id, skills, cap)
+        else:
+            operator.skills, operator.cap = skills, cap
+        self._push(operator)
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return operator
+
+    async def role_changed(self, user_id: int, role: str) -> None:
+        """Добавляет или убирает оператора после смены роли; другие воркеры узнают при сверке"""
+        if role != OPERATOR_ROLE:
+            if self._operators.pop(user_id, None) is not None:
+                # Записи в кучах с тем же id иначе совпали бы по version с оператором, добавленным заново
+                for key, heap in self._heaps.items():
+                    self._heaps[key] = [entry for entry in heap if entry[1] != user_id]
+                    heapq.heapify(self._heaps[key])
+            return
+
+        async with AsyncSessionLocal() as session:
+            row = (await session.execute(
+                select(User.skills, User.max_open_tickets, User.open_tickets).where(User.id == user_id)
+            )).one_or_none()
+        if row is None:
+            return
+        cap = row.max_open_tickets if row.max_open_tickets is not None else self.default_cap
+        operator = self.configure_operator(user_id, parse_skills(row.skills), cap)
+        if operator.load != row.open_tickets:
+            operator.load = row.open_tickets
+            self._push(operator)
+
+    def load_of(self, operator_id: int) -> int:
+        operator = self._operators.get(operator_id)
+        return operator.load if operator is not None else 0
+
+    async def reconcile(self) -> None:
+        """Пересобирает операторов, нагрузку и очередь по БД"""
+        async with AsyncSessionLocal() as session:
+            operators = (await session.execute(
+                select(User.id, User.skills, User.max_open_tickets, User.open_tickets).where(User.role == OPERATOR_ROLE)
+            )).all()
+            loads = dict((await session.execute(
+                select(Ticket.assignee_id, func.count())
+                .where(Ticket.assignee_id.is_not(None), Ticket.status.in_(ACTIVE_STATUSES))
+                .group_by(Ticket.assignee_id)
+            )).all())
+            pending = (await session.execute(
+                select(Ticket.id, Ticket.category, Ticket.created_at)
+                .where(Ticket.assignee_id.is_(None), Ticket.status == "open")
+                .order_by(Ticket.id)
+                .limit(self.pending_max)
+            )).all()
+
+            # Счётчики, разошедшиеся с заявками после прямых правок в БД. Условие
+            # на прочитанное значение не затирает места, занятые после чтения
+            drifted = [row for row in operators if row.open_tickets != loads.get(row.id, 0)]
+            for row in drifted:
+                await session.execute(
+                    update(User)
+                    .where(User.id == row.id, User.open_tickets == row.open_tickets)
+                    .values(open_tickets=loads.get(row.id, 0))
+                    .execution_options(synchronize_session=False)
+                )
+            await session.commit()
+        if drifted:
+            logger.warning(f"Corrected open ticket counters of {len(drifted)} operators")
+
+        self._operators = {
+            row.id: OperatorState(
+                row.id,
+                parse_skills(row.skills),
+                row.max_open_tickets if row.max_open_tickets is not None else self.default_cap,
+                loads.get(row.id, 0),
+            )
+            for row in operators
+        }
+        self._heaps = {}
+        for operator in self._operators.values():
+            operator.version += 1
+            if operator.load < operator.cap:
+                for key in operator.heap_keys():
+                    self._heaps.setdefault(key, []).append((operator.load, operator.id, operator.version))
+        for heap in self._heaps.values():
+            heapq.heapify(heap)
+
+        self._pending = {}
+        self._pending_ids = set()
+        for row in pending:
+            self._pending.setdefault(normalize_category(row.category) or ANY_CATEGORY, deque()).append((row.id, row.created_at))
+            self._pending_ids.add(row.id)
+        self.reconciled_at = datetime.utcnow()
+
+    async def _drain(self) -> None:
+        """Назначает ожидающие заявки операторам, у которых есть место"""
+        reserved: List[Tuple[int, int, str, datetime]] = []
+        for category, queue in self._pending.items():
+            while queue:
+                operator_id = self._reserve(None if category == ANY_CATEGORY else category)
+                if operator_id is None:
+                    break
+                ticket_id, created_at = queue.popleft()
+                self._pending_ids.discard(ticket_id)
+                reserved.append((ticket_id, operator_id, category, created_at))
+        self._pending = {category: queue for category, queue in self._pending.items() if queue}
+        if not reserved:
+            return
+
+        assigned = []
+        conflicts = []
+        requeued = []
+        try:
+            async with AsyncSessionLocal() as session:
+                # Заявку могли назначить вручную или закрыть, пока она ждала
+                waiting = set((await session.execute(
+                    select(Ticket.id)
+                    .where(
+                        Ticket.id.in_([item[0] for item in reserved]),
+                        Ticket.assignee_id.is_(None),
+                        Ticket.status == "open",
+                    )
+                    .with_for_update()
+                )).scalars())
+                wanted: Dict[int, int] = {}
+                for ticket_id, operator_id, _, _ in reserved:
+                    if ticket_id in waiting:
+                        wanted[operator_id] = wanted.get(operator_id, 0) + 1
+
+                # Места по счётчикам в БД: часть могли занять заявки других воркеров
+                room: Dict[int, int] = {}
+                if wanted:
+                    rows = (await session.execute(
+                        select(User.id, User.open_tickets, self._cap().label("cap"))
+                        .where(User.id.in_(list(wanted)), User.role == OPERATOR_ROLE)
+                        .order_by(User.id)
+                        .with_for_update()
+                    )).all()
+                    room = {row.id: max(0, min(wanted[row.id], row.cap - row.open_tickets)) for row in rows}
+
+                left = dict(room)
+                for item in reserved:
+                    ticket_id, operator_id = item[0], item[1]
+                    if ticket_id not in waiting:
+                        conflicts.append(operator_id)
+                    elif left.get(operator_id, 0) > 0:
+                        left[operator_id] -= 1
+                        assigned.append(item)
+                    else:
+                        requeued.append(item)
+
+                if assigned:
+                    taken = {operator_id: count for operator_id, count in room.items() if count}
+                    await session.execute(
+                        update(User)
+                        .where(User.id.in_(list(taken)))
+                        .values(open_tickets=User.open_tickets + case(taken, value=User.id, else_=0))
+                        .execution_options(synchronize_session=False)
+                    )
+                    await session.execute(
+                        update(Ticket)
+                        .where(Ticket.id.in_([item[0] for item in assigned]))
+                        .values(assignee_id=case({item[0]: item[1] for item in assigned}, value=Ticket.id))
+                        .execution_options(synchronize_session=False)
+                    )
+                await session.commit()
+        except Exception:
+            # Ничего не записано: снимаем резервы, заявки вернутся в очередь при сверке
+            for _, operator_id, _, _ in reserved:
+                self.adjust(operator_id, -1)
+            raise
+
+        for operator_id in conflicts:
+            ASSIGNMENTS.labels("conflict").inc()
+            self.adjust(operator_id, -1)
+
+        # Оператор заполнен заявками других воркеров: заявки возвращаются в начало очереди
+        for ticket_id, operator_id, category, created_at in reversed(requeued):
+            ASSIGNMENTS.labels("full").inc()
+            self._mark_full(operator_id)
+            self._pending.setdefault(category, deque()).appendleft((ticket_id, created_at))
+            self._pending_ids.add(ticket_id)
+
+        now = datetime.utcnow()
+        for ticket_id, operator_id, _, created_at in assigned:
+            ASSIGNMENTS.labels("assigned").inc()
+            ASSIGNMENT_WAIT_SECONDS.observe(max(0.0, (now - created_at).total_seconds()))
+            event_hub.publish(TOPIC_TICKETS, ASSIGNED_EVENT, {"id": ticket_id, "assignee_id": operator_id})
+        logger.info(f"Assigned {len(assigned)} queued tickets")
+
+    async def run(self, reconcile_interval: float) -> None:
+        """Фоновая задача: сверка с БД раз в interval и разбор очереди при освобождении мест"""
+        self._wakeup = asyncio.Event()
+        self.active = True
+        next_reconcile = 0.0
+        try:
+            while True:
+                if time.monotonic() >= next_reconcile:
+                    try:
+                        await self.reconcile()
+                    except Exception as exc:
+                        logger.error(f"Assignment reconciliation failed: {exc}")
+                    next_reconcile = time.monotonic() + reconcile_interval
+
+                self._wakeup.clear()
+                try:
+                    await self._drain()
+                except Exception as exc:
+                    logger.error(f"Assigning queued tickets failed: {exc}")
+
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), max(0.0, next_reconcile - time.monotonic()))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.active = False
+            self._wakeup = None
+
+    def snapshot(self) -> dict:
+        return {
+            "operators": len(self._operators),
+            "pending": self.pending_count,
+            "reconciled_at": self.reconciled_at.isoformat() if self.reconciled_at else None,
+        }
+
+
+assignment_engine = AssignmentEngine(
+    default_cap=settings.ASSIGNMENT_DEFAULT_MAX_OPEN_TICKETS,
+    pending_max=settings.ASSIGNMENT_PENDING_MAX,
+)
+
+ASSIGNMENT_QUEUE_DEPTH.set_function(lambda: assignment_engine.pending_count)
+
+
+async def require_operator(user_id: int) -> dict:
+    """Пользователь-оператор (для ручного назначения и настроек)"""
+    user = await get_user(user_id)
+    if user is None:
+        raise UserNotFoundException()
+    if user["role"] != OPERATOR_ROLE:
+        raise InvalidAssigneeException()
+    return user
+
+
+async def update_operator_settings(
+    db: AsyncSession,
+    user_id: int,
+    skills: Iterable[str],
+    max_open_tickets: Optional[int],
+) -> dict:
+    """Сохраняет навыки и предел оператора и сразу применяет их на этом воркере"""
+    await require_operator(user_id)
+    normalized = {skill for skill in (normalize_category(item) for item in skills) if skill}
+
+    await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(
+            skills=",".join(sorted(normalized)) or None,
+            max_open_tickets=max_open_tickets,
+            updated_at=datetime.utcnow().replace(microsecond=0),
+        )
+    )
+    await db.commit()
+    await invalidate_user(user_id)
+
+    cap = max_open_tickets if max_open_tickets is not None else assignment_engine.default_cap
+    assignment_engine.configure_operator(user_id, normalized, cap)
+    return {
+        "user_id": user_id,
+        "skills": sorted(normalized),
+        "max_open_tickets": cap,
+        "load": assignment_engine.load_of(user_id),
+    }
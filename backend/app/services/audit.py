@@ -0,0 +1,180 @@
+# app/services/audit.py
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Deque, List, Optional
+
+from sqlalchemy import Select, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.events import TOPIC_AUDIT, event_hub
+from app.core.metrics import AUDIT_EVENTS, AUDIT_QUEUE_DEPTH
+from app.database import AsyncSessionLocal
+from app.models.audit import AuditEvent
+
+logger = logging.getLogger(__name__)
+
+# Типы событий аудита
+LOGIN_SUCCEEDED = "login_succeeded"
+LOGIN_FAILED = "login_failed"
+LOGIN_THROTTLED = "login_throttled"
+USER_REGISTERED = "user_registered"
+USER_CREATED = "user_created"
+USER_ROLE_CHANGED = "user_role_changed"
+USERS_IMPORTED = "users_imported"
+
+
+class AuditLog:
+    """Журнал аудита с асинхронной пакетной записью.
+
+    record() только кладёт событие в очередь в памяти и не ждёт БД, поэтому вход
+    не платит за лишний коммит. Фоновый writer сбрасывает очередь multi-row
+    INSERT'ом, когда набралась пачка или прошёл интервал.
+
+    Очередь ограничена: если БД не успевает, новые события отбрасываются
+    (с метрикой), а запросы не блокируются и память не растёт.
+    """
+
+    def __init__(self, max_queue: int, batch_size: int, flush_interval: float):
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: Deque[dict] = deque()
+        self._batch_ready: Optional[asyncio.Event] = None
+        self._write_task: Optional[asyncio.Future] = None
+        self._dropped_logged_at = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def record(
+        self,
+        event_type: str,
+        actor_id: Optional[int] = None,
+        target_id: Optional[int] = None,
+        email: Optional[str] = None,
+        ip_address: Optional[str] = None,
+        details: Optional[dict] = None,
+    ) -> None:
+        """Ставит событие в очередь на запись (не блокирует)"""
+        if len(self._queue) >= self.max_queue:
+            AUDIT_EVENTS.labels("dropped").inc()
+            # Не чаще раза в минуту, чтобы перегрузка не превращалась в поток логов
+            now = time.monotonic()
+            if now - self._dropped_logged_at > 60:
+                self._dropped_logged_at = now
+                logger.warning(f"Audit queue full ({self.max_queue}), dropping events")
+            return
+
+        event = {
+            "created_at": datetime.utcnow(),
+            "event_type": event_type,
+            "actor_id": actor_id,
+            "target_id": target_id,
+            "email": email,
+            "ip_address": ip_address,
+            "details": details,
+        }
+        self._queue.append(event)
+        AUDIT_EVENTS.labels("queued").inc()
+        # Администраторы видят события аудита сразу, не дожидаясь записи в БД
+        event_hub.publish(TOPIC_AUDIT, event_type, event)
+        if len(self._queue) >= self.batch_size and self._batch_ready is not None:
+            self._batch_ready.set()
+
+    def _take_batch(self) -> List[dict]:
+        count = min(self.batch_size, len(self._queue))
+        return [self._queue.popleft() for _ in range(count)]
+
+    async def _write(self, batch: List[dict]) -> None:
+        try:
+            async with AsyncSessionLocal() as session:
+                await session.execute(insert(AuditEvent), batch)
+                await session.commit()
+        except Exception as exc:
+            # Пачка теряется: повтор копил бы события без ограничения при недоступной БД
+            AUDIT_EVENTS.labels("failed").inc(len(batch))
+            logger.error(f"Failed to write {len(batch)} audit events: {exc}")
+        else:
+            AUDIT_EVENTS.labels("written").inc(len(batch))
+
+    async def _drain(self) -> None:
+        while self._queue:
+            # shield: отмена writer'а при остановке не обрывает INSERT на середине
+            self._write_task = asyncio.ensure_future(self._write(self._take_batch()))
+            await asyncio.shield(self._write_task)
+
+    async def run_writer(self) -> None:
+        """Фоновая задача: запись по размеру пачки или по интервалу"""
+        # Событие создаётся в цикле, где работает writer
+        self._batch_ready = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self._drain()
+
+    async def flush(self) -> None:
+        """Дописывает всё, что осталось в очереди. Вызывать после остановки writer'а."""
+        if self._write_task is not None and not self._write_task.done():
+            await self._write_task
+        await self._drain()
+
+
+audit_log = AuditLog(
+    max_queue=settings.AUDIT_QUEUE_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+)
+
+AUDIT_QUEUE_DEPTH.set_function(lambda: audit_log.queued)
+
+
+# Колонки журнала для списков
+AUDIT_LIST_COLUMNS = (
+    AuditEvent.id,
+    AuditEvent.created_at,
+    AuditEvent.event_type,
+    AuditEvent.actor_id,
+    AuditEvent.target_id,
+    AuditEvent.email,
+    AuditEvent.ip_address,
+    AuditEvent.details,
+)
+
+
+def build_audit_query(
+    cursor: Optional[int] = None,
+    event_type: Optional[str] = None,
+    actor_id: Optional[int] = None,
+    target_id: Optional[int] = None,
+) -> Select:
+    """Журнал от новых событий к старым с keyset-пагинацией по id"""
+    stmt = select(*AUDIT_LIST_COLUMNS).order_by(AuditEvent.id.desc())
+
+    if cursor is not None:
+        stmt = stmt.where(AuditEvent.id < cursor)
+    if event_type is not None:
+        stmt = stmt.where(AuditEvent.event_type == event_type)
+    if actor_id is not None:
+        stmt = stmt.where(AuditEvent.actor_id == actor_id)
+    if target_id is not None:
+        stmt = stmt.where(AuditEvent.target_id == target_id)
+
+    return stmt
+
+
+async def list_audit_page(db: AsyncSession, stmt: Select, limit: int) -> dict:
+    """Одна страница журнала и курсор на следующую"""
+    result = await db.execute(stmt.limit(limit + 1))
+    rows = result.all()
+
+    items = [dict(row._mapping) for row in rows[:limit]]
+    next_cursor = items[-1]["id"] if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
@@ -0,0 +1,391 @@
+# app/services/sla.py
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Hashable, Iterator, List, Optional, Set, Tuple
+
+import orjson
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app.core.config import settings
+from app.core.events import TOPIC_TICKETS, EventMessage, event_hub
+from app.core.leader import LeaderElection
+from app.core.metrics import SLA_BREACHES, SLA_FIRE_DELAY, SLA_SCHEDULED
+from app.database import AsyncSessionLocal
+from app.models.sla import SlaBreach
+from app.models.ticket import Ticket
+
+logger = logging.getLogger(__name__)
+
+# Виды SLA
+RESPONSE = "response"        # заявку взяли в работу
+RESOLUTION = "resolution"    # заявку решили или закрыли
+
+# Какие сроки действуют в каком статусе; в resolved и closed сроков нет
+STATUS_KINDS = {
+    "open": (RESPONSE, RESOLUTION),
+    "in_progress": (RESOLUTION,),
+}
+
+# События заявок, по которым пересчитываются сроки
+TICKET_EVENTS = {"ticket.created", "ticket.updated"}
+BREACH_EVENT = "ticket.sla_breached"
+
+# Сколько нарушений фиксируется за один проход таймера (одним INSERT)
+FIRE_BATCH_SIZE = 500
+# Через сколько секунд повторить запись нарушений, если БД не ответила
+FIRE_RETRY_SECONDS = 5.0
+
+# Досчитывание захватывает и конец прошлого прохода: строку долгой транзакции
+# прошлый запрос мог не увидеть, хотя её метка времени уже старше отметки
+CATCHUP_OVERLAP = timedelta(minutes=1)
+
+
+def _timestamp(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class DeadlineScheduler:
+    """Очередь сроков на куче с ленивым удалением.
+
+    Изменение и отмена срока не ищут запись в куче: старая запись помечается
+    удалённой и выбрасывается, когда доходит до вершины. Когда удалённых
+    становится больше живых, куча пересобирается за O(n).
+    """
+
+    COMPACT_MIN_SIZE = 1024
+
+    def __init__(self):
+        self._heap: List[list] = []
+        self._entries: Dict[Hashable, list] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def schedule(self, key: Hashable, deadline: float) -> bool:
+        """Ставит или переносит срок; True — он стал ближайшим"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry[0] == deadline:
+                return False
+            entry[2] = None
+        entry = [deadline, next(self._counter), key]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        self._maybe_compact()
+        return self._heap[0] is entry
+
+    def cancel(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry[2] = None
+            self._maybe_compact()
+
+    def clear(self) -> None:
+        self._heap.clear()
+        self._entries.clear()
+
+    def next_deadline(self) -> Optional[float]:
+        while self._heap and self._heap[0][2] is None:
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float, limit: int) -> List[Tuple[Hashable, float]]:
+        """Наступившие сроки (не больше limit), от ранних к поздним"""
+        due = []
+        while self._heap and len(due) < limit and self._heap[0][0] <= now:
+            deadline, _, key = heapq.heappop(self._heap)
+            if key is not None:
+                del self._entries[key]
+                due.append((key, deadline))
+        return due
+
+    def _maybe_compact(self) -> None:
+        if len(self._heap) > self.COMPACT_MIN_SIZE and len(self._heap) > 2 * len(self._entries):
+            self._heap = [entry for entry in self._heap if entry[2] is not None]
+            heapq.heapify(self._heap)
+
+
+class SlaEngine:
+    """Отслеживание сроков SLA открытых заявок без периодических сканирований таблицы.
+
+    Работает только на воркере-лидере (аренда в leader_leases). При получении
+    лидерства сроки открытых заявок загружаются в DeadlineScheduler одним
+    потоковым запросом, дальше их меняют события заявок из event_hub. События
+    приходят только с тех воркеров, что делят брокер с лидером, поэтому раз
+    в catchup_interval заявки, созданные или изменённые после прошлого прохода,
+    досчитываются по индексам created_at и updated_at. Таймер спит ровно до
+    ближайшего срока и перед записью одним запросом проверяет, что заявки ещё
+    активны; нарушения пишутся в sla_breaches, ключ которой не даёт
+    зафиксировать нарушение повторно после смены лидера, и публикуются
+    в топик tickets.
+    """
+
+    def __init__(self, response_minutes: Dict[str, int], resolution_minutes: Dict[str, int], election: LeaderElection):
+        self.limits = {RESPONSE: response_minutes, RESOLUTION: resolution_minutes}
+        self.election = election
+        self.scheduler = DeadlineScheduler()
+        self._priorities: Dict[int, str] = {}
+        self._breached: Set[Tuple[int, str]] = set()
+        self._tracking = False
+        self._watchers: List[Set[int]] = []
+        self._created_mark: Optional[datetime] = None
+        self._updated_mark: Optional[datetime] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._timer_task: Optional[asyncio.Task] = None
+
+    @property
+    def active(self) -> bool:
+        return self._timer_task is not None
+
+    def deadlines(
+        self, status: Optional[str], priority: Optional[str], created_at: Optional[datetime]
+    ) -> Dict[str, float]:
+        """Действующие сроки заявки (unix time)"""
+        deadlines = {}
+        for kind in STATUS_KINDS.get(status, ()):
+            minutes = self.limits[kind].get(priority or "medium")
+            if minutes is not None:
+                deadlines[kind] = _timestamp(created_at) + minutes * 60
+        return deadlines
+
+    def track(
+        self, ticket_id: int, status: Optional[str], priority: Optional[str], created_at: Optional[datetime]
+    ) -> None:
+        """Приводит сроки заявки в соответствие с её текущим состоянием"""
+        deadlines = self.deadlines(status, priority, created_at)
+        for kind in (RESPONSE, RESOLUTION):
+            key = (ticket_id, kind)
+            if kind in deadlines and key not in self._breached:
+                if self.scheduler.schedule(key, deadlines[kind]) and self._wakeup is not None:
+                    self._wakeup.set()
+            else:
+                self.scheduler.cancel(key)
+
+        if deadlines:
+            self._priorities[ticket_id] = priority or "medium"
+        else:
+            # Заявка решена или закрыта: её больше не нужно помнить
+            self._priorities.pop(ticket_id, None)
+            self._breached.discard((ticket_id, RESPONSE))
+            self._breached.discard((ticket_id, RESOLUTION))
+
+    def _on_ticket_event(self, message: EventMessage) -> None:
+        if not self._tracking or message.event_type not in TICKET_EVENTS:
+            return
+        data = orjson.loads(message.text)["data"]
+        for seen in self._watchers:
+            seen.add(data["id"])
+        self.track(data["id"], data["status"], data["priority"], datetime.fromisoformat(data["created_at"]))
+
+    @contextmanager
+    def _watch_events(self) -> Iterator[Set[int]]:
+        """Заявки, события которых пришли во время чтения из БД: прочитанные строки по ним устарели"""
+        seen: Set[int] = set()
+        self._watchers.append(seen)
+        try:
+            yield seen
+        finally:
+            self._watchers.remove(seen)
+
+    async def _load(self) -> None:
+        active_statuses = list(STATUS_KINDS)
+        with self._watch_events() as seen:
+            async with AsyncSessionLocal() as session:
+                # Отметки досчитывания — до загрузки: изменения во время неё попадут в первый проход
+                self._created_mark, self._updated_mark = (await session.execute(
+                    select(func.max(Ticket.created_at), func.max(Ticket.updated_at))
+                )).one()
+
+                result = await session.execute(
+                    select(SlaBreach.ticket_id, SlaBreach.kind)
+                    .join(Ticket, Ticket.id == SlaBreach.ticket_id)
+                    .where(Ticket.status.in_(active_statuses))
+                )
+                self._breached.update((row.ticket_id, row.kind) for row in result)
+
+                stmt = select(Ticket.id, Ticket.status, Ticket.priority, Ticket.created_at).where(
+                    Ticket.status.in_(active_statuses)
+                )
+                stream = await session.stream(stmt.execution_options(yield_per=5000))
+                async for rows in stream.partitions():
+                    for row in rows:
+                        # Событие, пришедшее во время загрузки, новее строки из запроса
+                        if row.id not in seen and row.created_at is not None:
+                            self.track(row.id, row.status, row.priority, row.created_at)
+        logger.info(f"SLA engine loaded {len(self.scheduler)} deadlines")
+
+    async def _catch_up(self) -> None:
+        """Досчитывает заявки, созданные или изменённые после прошлого прохода (в том числе на других воркерах)"""
+        columns = (Ticket.id, Ticket.status, Ticket.priority, Ticket.created_at, Ticket.updated_at)
+        rows = []
+        with self._watch_events() as seen:
+            async with AsyncSessionLocal() as session:
+                # У каждой метки своя отметка: created_at пишет приложение, updated_at — NOW() сервера БД
+                for column, mark in ((Ticket.created_at, self._created_mark), (Ticket.updated_at, self._updated_mark)):
+                    condition = column.is_not(None) if mark is None else column >= mark - CATCHUP_OVERLAP
+                    rows.extend((await session.execute(select(*columns).where(condition))).all())
+
+        for row in rows:
+            if row.id not in seen and row.created_at is not None:
+                self.track(row.id, row.status, row.priority, row.created_at)
+            if row.created_at is not None and (self._created_mark is None or row.created_at > self._created_mark):
+                self._created_mark = row.created_at
+            if row.updated_at is not None and (self._updated_mark is None or row.updated_at > self._updated_mark):
+                self._updated_mark = row.updated_at
+
+    async def _activate(self) -> None:
+        self._tracking = True
+        try:
+            await self._load()
+        except Exception:
+            self._deactivate()
+            raise
+        self._wakeup = asyncio.Event()
+        self._timer_task = asyncio.create_task(self._run_timer())
+
+    def _deactivate(self) -> None:
+        if self._timer_task is not None:
+            self._timer_task.cancel()
+        self._timer_task = None
+        self._wakeup = None
+        self._tracking = False
+        self.scheduler.clear()
+        self._priorities.clear()
+        self._breached.clear()
+
+    async def _run_timer(self) -> None:
+        """Спит до ближайшего срока; новый более ранний срок будит таймер сразу"""
+        while True:
+            deadline = self.scheduler.next_deadline()
+            delay = None if deadline is None else deadline - time.time()
+            if delay is None or delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            due = self.scheduler.pop_due(time.time(), FIRE_BATCH_SIZE)
+            try:
+                await self._fire(due)
+            except Exception as exc:
+                logger.error(f"Failed to record {len(due)} SLA breaches: {exc}")
+                # Сроки уже сняты с кучи: возвращаем их, иначе нарушения не запишутся до смены лидера
+                retry_at = time.time() + FIRE_RETRY_SECONDS
+                for key, _ in due:
+                    if key not in self.scheduler:
+                        self.scheduler.schedule(key, retry_at)
+
+    async def _fire(self, due: List[Tuple[Tuple[int, str], float]]) -> None:
+        ticket_ids = list({ticket_id for (ticket_id, _), _ in due})
+        breached_at = datetime.utcnow()
+        rows = []
+        with self._watch_events() as seen:
+            async with AsyncSessionLocal() as session:
+                # Заявку могли решить или изменить на другом воркере: срок проверяется по текущей строке
+                current = {row.id: row for row in await session.execute(
+                    select(Ticket.id, Ticket.status, Ticket.priority, Ticket.created_at).where(Ticket.id.in_(ticket_ids))
+                )}
+                now = time.time()
+                for (ticket_id, kind), _ in due:
+                    row = current.get(ticket_id)
+                    deadline = None if row is None else self.deadlines(row.status, row.priority, row.created_at).get(kind)
+                    if ticket_id in seen or deadline is None or deadline > now:
+                        continue
+                    rows.append({
+                        "ticket_id": ticket_id,
+                        "kind": kind,
+                        "priority": row.priority or "medium",
+                        "deadline": datetime.utcfromtimestamp(deadline),
+                        "breached_at": breached_at,
+                    })
+                if rows:
+                    await session.execute(_insert_ignore(session.get_bind().dialect.name), rows)
+                    await session.commit()
+        # Только после записи: иначе при ошибке track() отменил бы незаписанные нарушения
+        self._breached.update((row["ticket_id"], row["kind"]) for row in rows)
+
+        # Остальные сроки — по текущему состоянию: перенос, отмена, удалённая заявка забывается
+        for ticket_id in ticket_ids:
+            if ticket_id in seen:
+                continue
+            row = current.get(ticket_id)
+            if row is None:
+                self.track(ticket_id, None, None, None)
+            else:
+                self.track(row.id, row.status, row.priority, row.created_at)
+
+        for row in rows:
+            SLA_BREACHES.labels(row["kind"], row["priority"]).inc()
+            SLA_FIRE_DELAY.observe(now - _timestamp(row["deadline"]))
+            event_hub.publish(TOPIC_TICKETS, BREACH_EVENT, {
+                "ticket_id": row["ticket_id"],
+                "kind": row["kind"],
+                "priority": row["priority"],
+                "deadline": row["deadline"].isoformat(),
+            })
+        if rows:
+            logger.info(f"Recorded {len(rows)} SLA breaches")
+
+    async def run(self, renew_interval: float, catchup_interval: float) -> None:
+        """Фоновая задача: борьба за лидерство и работа движка, пока воркер — лидер"""
+        event_hub.add_listener(TOPIC_TICKETS, self._on_ticket_event)
+        next_catchup = 0.0
+        try:
+            while True:
+                if await self.election.acquire():
+                    if not self.active:
+                        try:
+                            await self._activate()
+                        except Exception as exc:
+                            logger.error(f"SLA engine failed to load deadlines: {exc}")
+                        next_catchup = time.monotonic() + catchup_interval
+                    elif time.monotonic() >= next_catchup:
+                        try:
+                            await self._catch_up()
+                        except Exception as exc:
+                            logger.error(f"SLA catch-up scan failed: {exc}")
+                        next_catchup = time.monotonic() + catchup_interval
+                elif self.active:
+                    logger.info("SLA engine stopped: leader lease lost")
+                    self._deactivate()
+                await asyncio.sleep(renew_interval)
+        finally:
+            event_hub.remove_listener(TOPIC_TICKETS, self._on_ticket_event)
+            self._deactivate()
+            await self.election.release()
+
+    def snapshot(self) -> dict:
+        next_deadline = self.scheduler.next_deadline()
+        return {
+            "leader": self.active,
+            "scheduled": len(self.scheduler),
+            "next_deadline": datetime.utcfromtimestamp(next_deadline).isoformat() if next_deadline else None,
+        }
+
+
+def _insert_ignore(dialect: str):
+    """INSERT, пропускающий уже зафиксированные нарушения"""
+    if dialect == "sqlite":
+        return sqlite_insert(SlaBreach).on_conflict_do_nothing()
+    return insert(SlaBreach).prefix_with("IGNORE", dialect="mysql")
+
+
+sla_engine = SlaEngine(
+    response_minutes=settings.sla_response_minutes,
+    resolution_minutes=settings.sla_resolution_minutes,
+    election=LeaderElection("sla", ttl=settings.LEADER_LEASE_TTL_SECONDS),
+)
+
+SLA_SCHEDULED.set_function(lambda: len(sla_engine.scheduler))
@@ -0,0 +1,127 @@
+# app/services/stats.py
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models.rollup import TicketRollup
+from app.models.ticket import Ticket
+from app.models.user import User
+from app.services.ticket_rollups import DAY
+
+logger = logging.getLogger(__name__)
+
+# Статусы, в которых заявка считается активной
+ACTIVE_STATUSES = ("open", "in_progress")
+
+
+def current_week_start(now: Optional[datetime] = None) -> datetime:
+    """Начало текущей недели (понедельник 00:00, UTC)"""
+    now = now or datetime.utcnow()
+    monday = now - timedelta(days=now.weekday())
+    return monday.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+class DashboardStats:
+    """Агрегаты дашборда администратора.
+
+    Счётчики обновляются на записях пользователей и заявок и отдаются за O(1).
+    Фоновая сверка с БД периодически исправляет расхождения (записи из других
+    воркеров, прямые правки в БД и т.п.).
+
+    «Решено за неделю» — переходы в resolved с понедельника (UTC, часы
+    приложения); сверка берёт то же число из дневных интервалов ticket_rollups.
+    """
+
+    def __init__(self):
+        self.total_users = 0
+        self.active_tickets = 0
+        self.resolved_this_week = 0
+        self.week_start = current_week_start()
+        self.reconciled_at: Optional[datetime] = None
+        self._reconciled_monotonic: Optional[float] = None
+
+    def _roll_week(self) -> None:
+        week_start = current_week_start()
+        if week_start > self.week_start:
+            self.week_start = week_start
+            self.resolved_this_week = 0
+
+    def user_created(self, count: int = 1) -> None:
+        self.total_users += count
+
+    def ticket_created(self, status: str = "open") -> None:
+        if status in ACTIVE_STATUSES:
+            self.active_tickets += 1
+
+    def ticket_status_changed(self, old_status: Optional[str], new_status: Optional[str]) -> None:
+        if old_status == new_status:
+            return
+
+        if old_status in ACTIVE_STATUSES and new_status not in ACTIVE_STATUSES:
+            self.active_tickets -= 1
+        elif old_status not in ACTIVE_STATUSES and new_status in ACTIVE_STATUSES:
+            self.active_tickets += 1
+
+        if new_status == "resolved":
+            self._roll_week()
+            self.resolved_this_week += 1
+
+    async def reconcile(self) -> None:
+        """Пересчитывает счётчики по БД, сохраняя изменения, пришедшие во время запросов"""
+        self._roll_week()
+        week_start = self.week_start
+        before = (self.total_users, self.active_tickets, self.resolved_this_week)
+        async with AsyncSessionLocal() as session:
+            total_users = await session.scalar(select(func.count()).select_from(User))
+            active_tickets = await session.scalar(
+                select(func.count()).select_from(Ticket).where(Ticket.status.in_(ACTIVE_STATUSES))
+            )
+            resolved_this_week = await session.scalar(
+                select(func.coalesce(func.sum(TicketRollup.count), 0)).where(
+                    TicketRollup.granularity == DAY,
+                    TicketRollup.metric == "resolved",
+                    TicketRollup.bucket_start >= week_start,
+                )
+            )
+
+        self.total_users = total_users + self.total_users - before[0]
+        self.active_tickets = active_tickets + self.active_tickets - before[1]
+        self._roll_week()
+        if self.week_start == week_start:
+            self.resolved_this_week = resolved_this_week + self.resolved_this_week - before[2]
+        self.reconciled_at = datetime.utcnow()
+        self._reconciled_monotonic = time.monotonic()
+
+    async def run_reconciler(self, interval: float) -> None:
+        """Фоновая задача: сверка при старте и затем каждые interval секунд"""
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as exc:
+                logger.error(f"Dashboard stats reconciliation failed: {exc}")
+            await asyncio.sleep(interval)
+
+    def snapshot(self) -> dict:
+        """Текущие значения и давность последней сверки"""
+        self._roll_week()
+        staleness = None
+        if self._reconciled_monotonic is not None:
+            staleness = round(time.monotonic() - self._reconciled_monotonic, 3)
+
+        return {
+            "stats": {
+                "total_users": self.total_users,
+                "active_tickets": self.active_tickets,
+                "resolved_this_week": self.resolved_this_week,
+            },
+            "reconciled_at": self.reconciled_at.isoformat() if self.reconciled_at else None,
+            "staleness_seconds": staleness,
+        }
+
+
+dashboard_stats = DashboardStats()
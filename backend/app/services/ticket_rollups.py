@@ -0,0 +1,225 @@
+# app/services/ticket_rollups.py
+import logging
+import math
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import InvalidTimeRangeException
+from app.database import AsyncSessionLocal
+from app.models.rollup import TicketRollup
+from app.models.ticket import Ticket
+from app.schemas.ticket import TicketPriority
+
+logger = logging.getLogger(__name__)
+
+# Гранулярность хранимых интервалов
+HOUR = "hour"
+DAY = "day"
+GRANULARITIES = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+
+# Метрики: opened — создание заявки, остальные — переход заявки в этот статус
+METRIC_OPENED = "opened"
+
+# Интервалы точек графика; крупные строятся из дневных интервалов, мелкие — из часовых
+INTERVALS = {
+    "1h": timedelta(hours=1),
+    "3h": timedelta(hours=3),
+    "6h": timedelta(hours=6),
+    "12h": timedelta(hours=12),
+    "1d": timedelta(days=1),
+    "7d": timedelta(days=7),
+    "30d": timedelta(days=30),
+}
+
+REBUILD_INSERT_BATCH = 1000
+
+_UPSERTS = {"mysql": mysql_insert, "postgresql": postgresql_insert, "sqlite": sqlite_insert}
+
+
+def truncate(value: datetime, granularity: str) -> datetime:
+    """Начало часового или дневного интервала, в который попадает value"""
+    if granularity == DAY:
+        return value.replace(hour=0, minute=0, second=0, microsecond=0)
+    return value.replace(minute=0, second=0, microsecond=0)
+
+
+def as_utc(value: datetime) -> datetime:
+    """Время без часового пояса в UTC, как хранится в БД"""
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def rollup_rows(metric: str, priority: Optional[str], at: datetime, count: int = 1) -> List[dict]:
+    """Строки часового и дневного интервалов для одного события"""
+    return [
+        {
+            "granularity": granularity,
+            "metric": metric,
+            "bucket_start": truncate(at, granularity),
+            "priority": priority or "medium",
+            "count": count,
+        }
+        for granularity in GRANULARITIES
+    ]
+
+
+def _upsert_statement(dialect: str, rows: List[dict]):
+    upsert = _UPSERTS.get(dialect)
+    if upsert is None:
+        raise ValueError(f"Ticket rollups are not supported on {dialect}")
+
+    stmt = upsert(TicketRollup).values(rows)
+    if dialect == "mysql":
+        return stmt.on_duplicate_key_update(count=TicketRollup.count + stmt.inserted.count)
+    return stmt.on_conflict_do_update(
+        index_elements=[column.name for column in TicketRollup.__table__.primary_key],
+        set_={"count": TicketRollup.count + stmt.excluded.count},
+    )
+
+
+async def apply_rollups(db: AsyncSession, rows: List[dict]) -> None:
+    """Увеличивает счётчики одним INSERT ... ON DUPLICATE KEY UPDATE.
+
+    Не коммитит: выполняется в транзакции записи заявки, поэтому счётчики
+    меняются атомарно вместе с ней. Строки всегда идут в одном порядке
+    (час, затем день), чтобы одновременные записи не ловили дедлок.
+    """
+    if rows:
+        await db.execute(_upsert_statement(db.get_bind().dialect.name, rows))
+
+
+async def record_ticket_created(db: AsyncSession, ticket: Ticket) -> None:
+    await apply_rollups(db, rollup_rows(METRIC_OPENED, ticket.priority, ticket.created_at))
+
+
+async def record_status_change(db: AsyncSession, ticket: Ticket, old_status: Optional[str]) -> None:
+    if ticket.status != old_status:
+        await apply_rollups(db, rollup_rows(ticket.status, ticket.priority, datetime.utcnow()))
+
+
+async def rebuild_rollups(since: Optional[datetime] = None) -> int:
+    """Пересчитывает интервалы по таблице tickets (с начала дня since или за всю историю).
+
+    История переходов не хранится, поэтому из заявки восстанавливается только
+    создание и переход в текущий статус (по updated_at). Заявки, записанные
+    во время пересчёта, могут посчитаться неточно — повторный запуск это исправит.
+    Возвращает число записанных интервалов.
+    """
+    start = truncate(as_utc(since), DAY) if since is not None else None
+    counts: Counter = Counter()
+
+    async with AsyncSessionLocal() as session:
+        stmt = select(Ticket.created_at, Ticket.updated_at, Ticket.status, Ticket.priority)
+        if start is not None:
+            stmt = stmt.where(or_(Ticket.created_at >= start, Ticket.updated_at >= start))
+
+        result = await session.stream(stmt.execution_options(yield_per=5000))
+        async for rows in result.partitions():
+            for row in rows:
+                events = [(METRIC_OPENED, row.created_at)]
+                if row.status != "open":
+                    events.append((row.status, row.updated_at or row.created_at))
+                for metric, at in events:
+                    if at is None or (start is not None and at < start):
+                        continue
+                    for item in rollup_rows(metric, row.priority, at):
+                        counts[(item["granularity"], metric, item["bucket_start"], item["priority"])] += 1
+
+        purge = delete(TicketRollup)
+        if start is not None:
+            purge = purge.where(TicketRollup.bucket_start >= start)
+        await session.execute(purge)
+
+        values = [
+            {"granularity": granularity, "metric": metric, "bucket_start": bucket_start, "priority": priority, "count": count}
+            for (granularity, metric, bucket_start, priority), count in counts.items()
+        ]
+        for offset in range(0, len(values), REBUILD_INSERT_BATCH):
+            await session.execute(insert(TicketRollup), values[offset:offset + REBUILD_INSERT_BATCH])
+        await session.commit()
+
+    logger.info(f"Ticket rollups rebuilt since {start or 'beginning'}: {len(values)} buckets")
+    return len(values)
+
+
+def choose_interval(start: datetime, end: datetime, max_points: int) -> str:
+    """Самый мелкий интервал, при котором точек не больше max_points"""
+    for name, interval in INTERVALS.items():
+        if math.ceil((end - start) / interval) <= max_points:
+            return name
+    raise InvalidTimeRangeException(detail=f"Time range too large for {max_points} points")
+
+
+async def ticket_timeseries(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    metrics: Sequence[str],
+    interval: Optional[str] = None,
+    priority: Optional[str] = None,
+    by_priority: bool = False,
+) -> dict:
+    """Ряды счётчиков за [start, end) с шагом interval.
+
+    Читаются только интервалы из ticket_rollups (не больше числа точек, умноженного
+    на число метрик и приоритетов), затем суммируются до шага графика. Границы
+    выравниваются на начало часа или дня; пустые точки заполняются нулями.
+    """
+    start, end = as_utc(start), as_utc(end)
+    if end <= start:
+        raise InvalidTimeRangeException(detail="'to' must be later than 'from'")
+
+    max_points = settings.TICKET_ROLLUP_MAX_POINTS
+    if interval is None:
+        interval = choose_interval(start, end, max_points)
+    step = INTERVALS[interval]
+    granularity = DAY if step % GRANULARITIES[DAY] == timedelta(0) else HOUR
+
+    origin = truncate(start, granularity)
+    points = math.ceil((end - origin) / step)
+    if points > max_points:
+        raise InvalidTimeRangeException(
+            detail=f"{points} points requested, at most {max_points}; use a larger interval"
+        )
+
+    stmt = select(TicketRollup.bucket_start, TicketRollup.metric, TicketRollup.priority, TicketRollup.count).where(
+        TicketRollup.granularity == granularity,
+        TicketRollup.metric.in_(metrics),
+        TicketRollup.bucket_start >= origin,
+        TicketRollup.bucket_start < end,
+    )
+    if priority is not None:
+        stmt = stmt.where(TicketRollup.priority == priority)
+
+    # Ряды создаются заранее: форма ответа не зависит от того, были ли события
+    priorities = [item.value for item in TicketPriority] if by_priority and priority is None else [priority]
+    series: Dict[Tuple[str, Optional[str]], List[int]] = {
+        (metric, series_priority): [0] * points for metric in metrics for series_priority in priorities
+    }
+
+    result = await db.execute(stmt)
+    for row in result:
+        counts = series.get((row.metric, row.priority if len(priorities) > 1 else priority))
+        if counts is not None:
+            counts[(row.bucket_start - origin) // step] += row.count
+
+    return {
+        "interval": interval,
+        "granularity": granularity,
+        "start": origin,
+        "end": origin + step * points,
+        "timestamps": [origin + step * index for index in range(points)],
+        "series": [
+            {"metric": metric, "priority": series_priority, "counts": counts}
+            for (metric, series_priority), counts in series.items()
+        ],
+    }
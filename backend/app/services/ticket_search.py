@@ -0,0 +1,252 @@
+# app/services/ticket_search.py
+import base64
+import heapq
+import logging
+import math
+import re
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import InvalidCursorException, InvalidSearchQueryException
+from app.database import AsyncSessionLocal, engine
+from app.models.ticket import Ticket
+
+logger = logging.getLogger(__name__)
+
+# Как innodb_ft_min_token_size по умолчанию: короткие слова FULLTEXT не индексирует
+MIN_TOKEN_LENGTH = 3
+MAX_QUERY_TERMS = 10
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(value: Optional[str]) -> List[str]:
+    """Слова текста в нижнем регистре (без слишком коротких)"""
+    if not value:
+        return []
+    return [token for token in _TOKEN_RE.findall(value.lower()) if len(token) >= MIN_TOKEN_LENGTH]
+
+
+def parse_query(query: str) -> List[str]:
+    """Уникальные слова поискового запроса; операторы FULLTEXT отбрасываются"""
+    terms = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+    if not terms:
+        raise InvalidSearchQueryException()
+    return terms
+
+
+def encode_search_cursor(score: float, ticket_id: int) -> str:
+    """Курсор по (релевантность, id) последней заявки страницы"""
+    raw = f"{score!r}|{ticket_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_search_cursor(cursor: str) -> Tuple[float, int]:
+    try:
+        score, ticket_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return float(score), int(ticket_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursorException()
+
+
+SearchPage = Tuple[List[Ticket], Optional[str]]
+
+
+class TicketSearchBackend(ABC):
+    """Поиск заявок по title и description: от релевантных к менее релевантным.
+
+    Страницы листаются по курсору (релевантность, id), а не по OFFSET.
+    """
+
+    async def start(self) -> None:
+        """Подготовка при старте воркера"""
+
+    def index_ticket(self, ticket: Ticket) -> None:
+        """Учитывает созданную или изменённую заявку"""
+
+    @abstractmethod
+    async def search(
+        self,
+        db: AsyncSession,
+        terms: List[str],
+        status: Optional[str],
+        user_id: Optional[int],
+        cursor: Optional[str],
+        limit: int,
+    ) -> SearchPage:
+        ...
+
+
+class FullTextTicketSearch(TicketSearchBackend):
+    """MySQL FULLTEXT (индекс ix_tickets_fulltext) через MATCH ... AGAINST.
+
+    Все слова запроса обязательны (+слово в BOOLEAN MODE); MySQL выбирает
+    строки по полнотекстовому индексу и сам считает релевантность.
+    """
+
+    async def search(self, db, terms, status, user_id, cursor, limit) -> SearchPage:
+        boolean_query = " ".join(f"+{term}" for term in terms)
+        relevance = match(Ticket.title, Ticket.description, against=boolean_query).in_boolean_mode()
+
+        stmt = (
+            select(Ticket, relevance.label("score"))
+            .where(relevance)
+            .order_by(relevance.desc(), Ticket.id.desc())
+        )
+        if status is not None:
+            stmt = stmt.where(Ticket.status == status)
+        if user_id is not None:
+            stmt = stmt.where(Ticket.user_id == user_id)
+        if cursor is not None:
+            last_score, last_id = decode_search_cursor(cursor)
+            stmt = stmt.where(or_(
+                relevance < last_score,
+                and_(relevance == last_score, Ticket.id < last_id),
+            ))
+
+        result = await db.execute(stmt.limit(limit + 1))
+        rows = result.all()
+
+        tickets = [row.Ticket for row in rows[:limit]]
+        next_cursor = None
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = encode_search_cursor(last.score, last.Ticket.id)
+        return tickets, next_cursor
+
+
+class InvertedIndexTicketSearch(TicketSearchBackend):
+    """Инвертированный индекс в памяти процесса — замена FULLTEXT для SQLite и тестов.
+
+    Индекс строится при старте воркера и обновляется при записи заявок через
+    сервис; записи из других процессов он не видит, поэтому для продакшена
+    с несколькими воркерами нужен FullTextTicketSearch. Ранжирование — BM25,
+    совпадение в title весит больше, чем в description.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    TITLE_WEIGHT = 2
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Counter] = {}
+        self._doc_lengths: Dict[int, int] = {}
+        self._doc_meta: Dict[int, Tuple[Optional[str], Optional[int]]] = {}
+        self._total_length = 0
+
+    async def start(self) -> None:
+        async with AsyncSessionLocal() as session:
+            stmt = select(Ticket.id, Ticket.title, Ticket.description, Ticket.status, Ticket.user_id)
+            result = await session.stream(stmt.execution_options(yield_per=5000))
+            async for rows in result.partitions():
+                for row in rows:
+                    self._add(row.id, row.title, row.description, row.status, row.user_id)
+        logger.info(f"Ticket search index built: {len(self._doc_terms)} tickets, {len(self._postings)} terms")
+
+    def index_ticket(self, ticket: Ticket) -> None:
+        self._remove(ticket.id)
+        self._add(ticket.id, ticket.title, ticket.description, ticket.status, ticket.user_id)
+
+    def _add(self, ticket_id, title, description, status, user_id) -> None:
+        terms = Counter(tokenize(description))
+        for token in tokenize(title):
+            terms[token] += self.TITLE_WEIGHT
+
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[ticket_id] = frequency
+        length = sum(terms.values())
+        self._doc_terms[ticket_id] = terms
+        self._doc_lengths[ticket_id] = length
+        self._doc_meta[ticket_id] = (status, user_id)
+        self._total_length += length
+
+    def _remove(self, ticket_id: int) -> None:
+        terms = self._doc_terms.pop(ticket_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[ticket_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(ticket_id)
+        del self._doc_meta[ticket_id]
+
+    def _score(self, terms: List[str], status: Optional[str], user_id: Optional[int]) -> List[Tuple[float, int]]:
+        postings = [self._postings.get(term) for term in terms]
+        if not all(postings):
+            return []
+
+        total = len(self._doc_terms)
+        avg_length = self._total_length / total
+        # Перебираем самый короткий список, остальные — проверка вхождения
+        postings.sort(key=len)
+        scored = []
+        for ticket_id in postings[0]:
+            if any(ticket_id not in other for other in postings[1:]):
+                continue
+            doc_status, doc_user_id = self._doc_meta[ticket_id]
+            if status is not None and doc_status != status:
+                continue
+            if user_id is not None and doc_user_id != user_id:
+                continue
+
+            norm = self.K1 * (1 - self.B + self.B * self._doc_lengths[ticket_id] / avg_length)
+            score = 0.0
+            for term_postings in postings:
+                frequency = term_postings[ticket_id]
+                idf = math.log(1 + (total - len(term_postings) + 0.5) / (len(term_postings) + 0.5))
+                score += idf * frequency * (self.K1 + 1) / (frequency + norm)
+            # Округление: курсор должен точно совпадать со значением при следующем запросе
+            scored.append((round(score, 6), ticket_id))
+        return scored
+
+    async def search(self, db, terms, status, user_id, cursor, limit) -> SearchPage:
+        scored = self._score(terms, status, user_id)
+        if cursor is not None:
+            last = decode_search_cursor(cursor)
+            scored = [item for item in scored if item < last]
+
+        page = heapq.nlargest(limit + 1, scored)
+        next_cursor = encode_search_cursor(*page[limit - 1]) if len(page) > limit else None
+        page = page[:limit]
+        if not page:
+            return [], None
+
+        result = await db.execute(select(Ticket).where(Ticket.id.in_([ticket_id for _, ticket_id in page])))
+        by_id = {ticket.id: ticket for ticket in result.scalars()}
+        # Заявка могла быть удалена из БД после индексации
+        return [by_id[ticket_id] for _, ticket_id in page if ticket_id in by_id], next_cursor
+
+
+def create_ticket_search(backend: str) -> TicketSearchBackend:
+    """Бэкенд поиска по имени из настроек ("auto" — FULLTEXT на MySQL, иначе индекс в памяти)"""
+    if backend == "auto":
+        backend = "fulltext" if engine.dialect.name == "mysql" else "memory"
+    if backend == "fulltext":
+        return FullTextTicketSearch()
+    if backend == "memory":
+        return InvertedIndexTicketSearch()
+    raise ValueError(f"Unknown ticket search backend: {backend}")
+
+
+ticket_search = create_ticket_search(settings.TICKET_SEARCH_BACKEND)
+
+
+async def search_tickets(
+    db: AsyncSession,
+    query: str,
+    status: Optional[str] = None,
+    user_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+) -> SearchPage:
+    """Страница результатов поиска и курсор на следующую"""
+    return await ticket_search.search(db, parse_query(query), status, user_id, cursor, limit)
@@ -0,0 +1,146 @@
+# app/services/tickets.py
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.events import TOPIC_TICKETS, event_hub, user_channel
+from app.core.exceptions import InvalidCursorException
+from app.models.ticket import Ticket
+from app.schemas.ticket import TicketCreate, TicketResponse, TicketUpdate
+from app.services.assignment import assignment_engine, normalize_category
+from app.services.stats import dashboard_stats
+from app.services.ticket_rollups import record_status_change, record_ticket_created
+from app.services.ticket_search import ticket_search
+
+# Поля, у которых явный null в PATCH очищает значение; в остальных null значит «не менять»
+CLEARABLE_FIELDS = {"assignee_id"}
+
+
+def encode_cursor(ticket: Ticket) -> str:
+    """Курсор keyset-пагинации: (created_at, id) последней заявки страницы"""
+    raw = f"{ticket.created_at.isoformat()}|{ticket.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, ticket_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursorException()
+
+
+def build_ticket_list_query(
+    status: Optional[str] = None,
+    priority: Optional[str] = None,
+    user_id: Optional[int] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+) -> Select:
+    """Запрос списка заявок, новые сверху.
+
+    Фильтры совпадают с префиксами составных индексов из модели Ticket,
+    а сортировка (created_at, id) — с их хвостом, поэтому выборка страницы
+    — это диапазонное сканирование индекса без сортировки.
+    """
+    stmt = select(Ticket).order_by(Ticket.created_at.desc(), Ticket.id.desc())
+
+    if status is not None:
+        stmt = stmt.where(Ticket.status == status)
+    if priority is not None:
+        stmt = stmt.where(Ticket.priority == priority)
+    if user_id is not None:
+        stmt = stmt.where(Ticket.user_id == user_id)
+    if created_from is not None:
+        stmt = stmt.where(Ticket.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(Ticket.created_at < created_to)
+    if cursor is not None:
+        stmt = stmt.where(tuple_(Ticket.created_at, Ticket.id) < tuple_(*decode_cursor(cursor)))
+
+    return stmt
+
+
+async def list_tickets(db: AsyncSession, stmt: Select, limit: int) -> Tuple[List[Ticket], Optional[str]]:
+    """Одна страница заявок и курсор на следующую"""
+    result = await db.execute(stmt.limit(limit + 1))
+    tickets = list(result.scalars().all())
+
+    next_cursor = encode_cursor(tickets[limit - 1]) if len(tickets) > limit else None
+    return tickets[:limit], next_cursor
+
+
+async def get_ticket(db: AsyncSession, ticket_id: int) -> Optional[Ticket]:
+    result = await db.execute(select(Ticket).where(Ticket.id == ticket_id))
+    return result.scalar_one_or_none()
+
+
+def publish_ticket_event(event_type: str, ticket: Ticket) -> None:
+    """Событие заявки для персонала и для автора заявки"""
+    data = TicketResponse.model_validate(ticket).model_dump(mode="json")
+    event_hub.publish(TOPIC_TICKETS, event_type, data)
+    if ticket.user_id is not None:
+        event_hub.publish(user_channel(ticket.user_id), event_type, data)
+
+
+async def create_ticket(db: AsyncSession, user_id: int, ticket_data: TicketCreate) -> Ticket:
+    """Создает заявку от имени пользователя и сразу назначает оператора, если есть свободный"""
+    category = normalize_category(ticket_data.category)
+    # Место оператора занимается в этой же транзакции: откат заявки его освобождает
+    assignee_id = await assignment_engine.claim(db, category)
+    ticket = Ticket(
+        title=ticket_data.title,
+        description=ticket_data.description,
+        priority=ticket_data.priority.value,
+        status="open",
+        user_id=user_id,
+        assignee_id=assignee_id,
+        category=category,
+        # Секундная точность, как у DATETIME в MySQL: курсор совпадает с хранимым значением
+        created_at=datetime.utcnow().replace(microsecond=0),
+    )
+    db.add(ticket)
+    try:
+        # Счётчики графиков — в той же транзакции, что и заявка
+        await record_ticket_created(db, ticket)
+        await db.commit()
+    except Exception:
+        assignment_engine.adjust(assignee_id, -1)
+        raise
+    await db.refresh(ticket)
+
+    if ticket.assignee_id is None:
+        assignment_engine.enqueue(ticket.id, ticket.category, ticket.created_at)
+    else:
+        assignment_engine.assigned(ticket)
+
+    dashboard_stats.ticket_created(ticket.status)
+    ticket_search.index_ticket(ticket)
+    publish_ticket_event("ticket.created", ticket)
+    return ticket
+
+
+async def update_ticket(db: AsyncSession, ticket: Ticket, ticket_data: TicketUpdate) -> Ticket:
+    """Применяет к заявке переданные поля"""
+    old_status = ticket.status
+    old_assignee_id = ticket.assignee_id
+    for field, value in ticket_data.model_dump(exclude_unset=True, mode="json").items():
+        if value is not None or field in CLEARABLE_FIELDS:
+            setattr(ticket, field, value)
+    ticket.category = normalize_category(ticket.category)
+
+    # Счётчики операторов до счётчиков графиков: тот же порядок блокировок, что у create_ticket
+    await assignment_engine.move_load(db, ticket, old_assignee_id, old_status)
+    await record_status_change(db, ticket, old_status)
+    await db.commit()
+    await db.refresh(ticket)
+
+    dashboard_stats.ticket_status_changed(old_status, ticket.status)
+    assignment_engine.ticket_changed(ticket, old_assignee_id, old_status)
+    ticket_search.index_ticket(ticket)
+    publish_ticket_event("ticket.updated", ticket)
+    return ticket
@@ -0,0 +1,238 @@
+# app/services/user_import.py
+import csv
+import io
+import logging
+import os
+from collections import Counter
+from datetime import datetime
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+
+import orjson
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.exceptions import HashingOverloadedException, InvalidImportFileException
+from app.core.hashing import password_hasher
+from app.models.user import User
+from app.schemas.user import UserCreate
+from app.services.stats import dashboard_stats
+
+logger = logging.getLogger(__name__)
+
+# Формат файла по расширению и по Content-Type
+IMPORT_EXTENSIONS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+IMPORT_CONTENT_TYPES = {"text/csv": "csv", "application/x-ndjson": "ndjson", "application/jsonl": "ndjson"}
+
+# Статусы строк в отчёте
+STATUS_CREATED = "created"
+STATUS_INVALID = "invalid"        # не прошла валидацию UserCreate
+STATUS_DUPLICATE = "duplicate"    # email уже встречался выше в этом файле
+STATUS_EXISTS = "exists"          # email уже зарегистрирован
+STATUS_FAILED = "failed"          # строку не удалось обработать, можно загрузить повторно
+
+# Отчёт держится в памяти до этого размера, дальше — во временном файле
+REPORT_SPOOL_BYTES = 1024 * 1024
+REPORT_CHUNK_BYTES = 64 * 1024
+
+
+def detect_import_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    """csv или ndjson по имени файла, иначе по Content-Type"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    fmt = IMPORT_EXTENSIONS.get(extension) or IMPORT_CONTENT_TYPES.get(media_type)
+    if fmt is None:
+        raise InvalidImportFileException()
+    return fmt
+
+
+def iter_import_rows(file: BinaryIO, fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Построчно читает файл: (номер строки, данные, ошибка разбора).
+
+    Файл не загружается в память целиком: CSV и NDJSON разбираются по строке.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        if fmt == "csv":
+            reader = csv.DictReader(text)
+            for row in reader:
+                # Пустые ячейки — как отсутствующие поля, лишние колонки отбрасываются
+                data = {key: value for key, value in row.items() if key is not None and value not in ("", None)}
+                yield reader.line_num, data, None
+        else:
+            for line_num, line in enumerate(text, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    data = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    yield line_num, None, "Invalid JSON"
+                    continue
+                if not isinstance(data, dict):
+                    yield line_num, None, "Expected a JSON object"
+                    continue
+                yield line_num, data, None
+    finally:
+        # Файл принадлежит UploadFile и закрывается им самим
+        text.detach()
+
+
+class ImportReport:
+    """Построчный отчёт импорта в NDJSON.
+
+    Пишется во временный файл, который остаётся в памяти только пока небольшой,
+    поэтому отчёт по файлу любого размера не держит память воркера.
+    """
+
+    def __init__(self):
+        self._file = SpooledTemporaryFile(max_size=REPORT_SPOOL_BYTES, mode="w+b")
+        self.counts: Counter = Counter()
+
+    def add(self, line: Optional[int], email: Optional[str], status: str, error: Optional[str] = None) -> None:
+        self.counts[status] += 1
+        self._file.write(orjson.dumps({"line": line, "email": email, "status": status, "error": error}) + b"\n")
+
+    def summary_headers(self) -> dict:
+        return {f"X-Import-{status.capitalize()}": str(count) for status, count in self.counts.items()}
+
+    def iter_bytes(self) -> Iterator[bytes]:
+        """Содержимое отчёта частями; файл закрывается после отдачи"""
+        try:
+            self._file.seek(0)
+            while chunk := self._file.read(REPORT_CHUNK_BYTES):
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+async def _insert_batch(db: AsyncSession, batch: List[Tuple[int, UserCreate]], report: ImportReport) -> None:
+    """Проверка существующих email, хеширование и вставка одной пачки"""
+    result = await db.execute(select(User.email).where(User.email.in_([user.email for _, user in batch])))
+    existing = {email.lower() for email in result.scalars()}
+    # Завершаем транзакцию, чтобы не держать соединение, пока идёт bcrypt
+    await db.rollback()
+
+    rows = []
+    for line, user in batch:
+        if user.email.lower() in existing:
+            report.add(line, user.email, STATUS_EXISTS, "Email already registered")
+        else:
+            rows.append((line, user))
+    if not rows:
+        return
+
+    try:
+        hashes = await password_hasher.hash_many([user.password for _, user in rows])
+    except HashingOverloadedException:
+        logger.warning(f"User import: hashing overloaded, {len(rows)} rows skipped")
+        for line, user in rows:
+            report.add(line, user.email, STATUS_FAILED, "Password hashing overloaded, retry this row")
+        return
+
+    created_at = datetime.utcnow().replace(microsecond=0)
+    values = [
+        {
+            "email": user.email,
+            "password": hashed,
+            "full_name": user.full_name,
+            "role": user.role.value,
+            "created_at": created_at,
+        }
+        for (_, user), hashed in zip(rows, hashes)
+    ]
+
+    try:
+        await db.execute(insert(User), values)
+        await db.commit()
+    except IntegrityError:
+        # Email заняли между проверкой и вставкой — вставляем пачку по одной строке
+        await db.rollback()
+        await _insert_one_by_one(db, rows, values, report)
+        return
+
+    for line, user in rows:
+        report.add(line, user.email, STATUS_CREATED)
+    dashboard_stats.user_created(len(rows))
+
+
+async def _insert_one_by_one(
+    db: AsyncSession,
+    rows: List[Tuple[int, UserCreate]],
+    values: List[dict],
+    report: ImportReport,
+) -> None:
+    created = 0
+    for (line, user), row_values in zip(rows, values):
+        try:
+            await db.execute(insert(User).values(**row_values))
+            await db.commit()
+        except IntegrityError:
+            await db.rollback()
+            report.add(line, user.email, STATUS_EXISTS, "Email already registered")
+        else:
+            report.add(line, user.email, STATUS_CREATED)
+            created += 1
+    dashboard_stats.user_created(created)
+
+
+async def import_users(db: AsyncSession, file: BinaryIO, fmt: str, report: ImportReport) -> None:
+    """Импорт пользователей из CSV/NDJSON пачками по USER_IMPORT_BATCH_SIZE.
+
+    Каждая пачка — один SELECT по email, bcrypt небольшими задачами пула
+    (процесс для входа и регистрации остаётся свободным),
+    один multi-row INSERT и коммит. Уже закоммиченные пачки при ошибке
+    в следующих не откатываются; результат по каждой строке — в report.
+    """
+    seen_emails = set()
+    batch: List[Tuple[int, UserCreate]] = []
+    rows = 0
+
+    try:
+        for line, data, error in iter_import_rows(file, fmt):
+            rows += 1
+            if rows > settings.USER_IMPORT_MAX_ROWS:
+                report.add(line, None, STATUS_FAILED, f"Row limit of {settings.USER_IMPORT_MAX_ROWS} exceeded, rest of file ignored")
+                break
+
+            if error:
+                report.add(line, None, STATUS_INVALID, error)
+                continue
+
+            try:
+                user = UserCreate.model_validate(data)
+            except ValidationError as exc:
+                email = data.get("email")
+                report.add(line, email if isinstance(email, str) else None, STATUS_INVALID, _validation_message(exc))
+                continue
+
+            email_key = user.email.lower()
+            if email_key in seen_emails:
+                report.add(line, user.email, STATUS_DUPLICATE, "Email already present earlier in the file")
+                continue
+            seen_emails.add(email_key)
+
+            batch.append((line, user))
+            if len(batch) >= settings.USER_IMPORT_BATCH_SIZE:
+                await _insert_batch(db, batch, report)
+                batch = []
+    except (UnicodeDecodeError, csv.Error) as exc:
+        logger.warning(f"User import: unreadable file after {rows} rows: {exc}")
+        report.add(None, None, STATUS_FAILED, "File is not valid UTF-8 CSV/NDJSON, rest of file ignored")
+
+    if batch:
+        await _insert_batch(db, batch, report)
+
+    logger.info(f"User import finished: {dict(report.counts)}")
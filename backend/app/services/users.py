@@ -0,0 +1,236 @@
+# app/services/users.py
+import asyncio
+import hashlib
+
+import orjson
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional
+
+from sqlalchemy import Select, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import create_cache_backend
+from app.core.dataloader import DataLoader
+from app.core.exceptions import (
+    EmailAlreadyExistsException,
+    ServiceUnavailableException,
+    UserNotFoundException
+)
+from app.core.singleflight import SingleFlight
+from app.core.config import settings
+from app.database import AsyncSessionLocal, replica_router
+from app.models.user import User
+from app.schemas.user import UserResponse
+from app.services.stats import dashboard_stats
+
+# Кэш пользовательских записей (без пароля) между роутерами и БД
+user_cache = create_cache_backend(
+    settings.USER_CACHE_BACKEND,
+    namespace="users",
+    max_size=settings.USER_CACHE_MAX_SIZE,
+)
+
+
+def _cache_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def serialize_user(user: User) -> dict:
+    """Преобразует ORM-объект в словарь для кэша и ответа API"""
+    return UserResponse.model_validate(user).model_dump(mode="json")
+
+
+# Одновременные промахи кэша по одному id выполняют один запрос к БД
+user_lookups = SingleFlight("user", timeout=settings.USER_LOOKUP_TIMEOUT_SECONDS)
+
+
+async def _load_user(user_id: int) -> Optional[dict]:
+    """Читает пользователя из primary и кладёт в кэш.
+
+    Общий вызов живёт дольше отдельного HTTP-запроса, поэтому работает в своей
+    сессии, а не в сессии get_db: она закрывается при любом исходе вызова.
+    """
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(select(User).where(User.id == user_id))
+        user = result.scalar_one_or_none()
+
+    if user is None:
+        return None
+
+    data = serialize_user(user)
+    await user_cache.set(_cache_key(user_id), data, settings.USER_CACHE_TTL_SECONDS)
+    return data
+
+
+async def get_user(user_id: int) -> Optional[dict]:
+    """Возвращает пользователя из кэша, при промахе — из БД (read-through)."""
+    cached = await user_cache.get(_cache_key(user_id))
+    if cached is not None:
+        return cached
+
+    try:
+        return await user_lookups.do(user_id, lambda: _load_user(user_id))
+    except asyncio.TimeoutError:
+        raise ServiceUnavailableException(detail="User lookup timed out")
+
+
+def user_etag(user: dict) -> str:
+    """Сильный ETag записи пользователя: id, время изменения и роль.
+
+    Считается по записи из кэша, поэтому 304 отдается без обращения к БД
+    и без сериализации тела.
+    """
+    version = f"{user['id']}:{user['updated_at']}:{user['role']}"
+    return '"' + hashlib.sha256(version.encode()).hexdigest()[:32] + '"'
+
+
+async def get_users_by_ids(db: AsyncSession, user_ids: List[int]) -> Dict[int, dict]:
+    """Пакетное чтение пользователей: кэш, затем один SELECT ... IN по промахам"""
+    found: Dict[int, dict] = {}
+    missing = []
+    for user_id in dict.fromkeys(user_ids):
+        cached = await user_cache.get(_cache_key(user_id))
+        if cached is not None:
+            found[user_id] = cached
+        else:
+            missing.append(user_id)
+
+    if missing:
+        result = await db.execute(select(User).where(User.id.in_(missing)))
+        for user in result.scalars():
+            data = serialize_user(user)
+            await user_cache.set(_cache_key(user.id), data, settings.USER_CACHE_TTL_SECONDS)
+            found[user.id] = data
+
+    return found
+
+
+def create_user_loader(db: AsyncSession) -> DataLoader:
+    """DataLoader пользователей по id поверх get_users_by_ids (один на HTTP-запрос)"""
+    return DataLoader(
+        lambda user_ids: get_users_by_ids(db, user_ids),
+        max_batch_size=settings.USER_BATCH_MAX_IDS,
+    )
+
+
+async def invalidate_user(user_id: int) -> None:
+    """Удаляет запись из кэша. Вызывать после коммита любой записи в users."""
+    await user_cache.delete(_cache_key(user_id))
+
+
+async def create_user_record(
+    db: AsyncSession,
+    email: str,
+    hashed_password: str,
+    full_name: Optional[str],
+    role: str,
+) -> User:
+    """Создаёт пользователя одним INSERT.
+
+    Уникальность email проверяет индекс users.email, а не предварительный
+    SELECT: так нет лишнего запроса и гонки двух одновременных регистраций.
+    created_at задаётся на клиенте, чтобы не перечитывать строку после вставки.
+    """
+    user = User(
+        email=email,
+        password=hashed_password,
+        full_name=full_name,
+        role=role,
+        created_at=datetime.utcnow().replace(microsecond=0),
+    )
+    db.add(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        raise EmailAlreadyExistsException()
+
+    dashboard_stats.user_created()
+    await user_cache.set(_cache_key(user.id), serialize_user(user), settings.USER_CACHE_TTL_SECONDS)
+    return user
+
+
+async def set_user_role(db: AsyncSession, user_id: int, role: str) -> dict:
+    """Меняет роль одним UPDATE ... WHERE id и возвращает актуальную запись.
+
+    Запись в кэше обновляется на месте (write-through); строка перечитывается
+    из БД только если её не было в кэше.
+    """
+    updated_at = datetime.utcnow().replace(microsecond=0)
+    result = await db.execute(
+        update(User)
+        .where(User.id == user_id)
+        .values(role=role, updated_at=updated_at)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        raise UserNotFoundException()
+    await db.commit()
+
+    cached = await user_cache.get(_cache_key(user_id))
+    if cached is None:
+        return await get_user(user_id)
+
+    user = {**cached, "role": role, "updated_at": updated_at.isoformat()}
+    await user_cache.set(_cache_key(user_id), user, settings.USER_CACHE_TTL_SECONDS)
+    return user
+
+
+# Колонки для списков: без пароля и без создания ORM-объектов
+USER_LIST_COLUMNS = (
+    User.id,
+    User.email,
+    User.full_name,
+    User.role,
+    User.created_at,
+    User.updated_at,
+)
+
+
+def build_user_list_query(
+    cursor: Optional[int] = None,
+    role: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+) -> Select:
+    """Запрос списка пользователей с keyset-пагинацией по users.id"""
+    stmt = select(*USER_LIST_COLUMNS).order_by(User.id)
+
+    if cursor is not None:
+        stmt = stmt.where(User.id > cursor)
+    if role is not None:
+        stmt = stmt.where(User.role == role)
+    if created_from is not None:
+        stmt = stmt.where(User.created_at >= created_from)
+    if created_to is not None:
+        stmt = stmt.where(User.created_at < created_to)
+
+    return stmt
+
+
+def user_row_to_dict(row) -> dict:
+    """Строка результата -> словарь (datetime сериализует orjson)"""
+    return dict(row._mapping)
+
+
+async def list_users_page(db: AsyncSession, stmt: Select, limit: int) -> dict:
+    """Одна страница списка и курсор на следующую"""
+    result = await db.execute(stmt.limit(limit + 1))
+    rows = result.all()
+
+    items = [user_row_to_dict(row) for row in rows[:limit]]
+    next_cursor = items[-1]["id"] if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def stream_users_ndjson(stmt: Select, chunk_size: int = 1000) -> AsyncIterator[bytes]:
+    """Отдает пользователей построчно в NDJSON через серверный курсор.
+
+    Сессия открывается внутри генератора: ответ стримится уже после выхода
+    из обработчика, и сессия из get_db к этому моменту может быть закрыта.
+    """
+    async with replica_router.read_session_factory()() as session:
+        result = await session.stream(stmt.execution_options(yield_per=chunk_size))
+        async for rows in result.partitions():
+            yield b"".join(orjson.dumps(user_row_to_dict(row)) + b"\n" for row in rows)
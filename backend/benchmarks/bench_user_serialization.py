@@ -0,0 +1,75 @@
+# benchmarks/bench_user_serialization.py
+"""Сравнение сериализации списка пользователей: до и после перехода на orjson.
+
+Запуск из каталога backend:
+    python -m benchmarks.bench_user_serialization [число_пользователей]
+"""
+import json
+import sys
+import timeit
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from typing import List
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.schemas.user import UserListResponse, UserResponse
+
+
+def make_rows(count: int) -> List[SimpleNamespace]:
+    """Объекты с атрибутами как у ORM-модели User"""
+    base = datetime(2024, 1, 1)
+    return [
+        SimpleNamespace(
+            id=i,
+            email=f"user{i}@example.com",
+            full_name=f"User {i}",
+            role="user",
+            created_at=base + timedelta(minutes=i),
+            updated_at=None,
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def main(count: int = 10000, repeat: int = 5) -> None:
+    rows = make_rows(count)
+    dicts = [vars(row) for row in rows]
+    adapter = TypeAdapter(List[UserResponse])
+
+    def before():
+        # Прежний путь: валидация response_model -> jsonable_encoder -> json.dumps
+        models = [UserResponse.model_validate(row) for row in rows]
+        return json.dumps(jsonable_encoder(models)).encode()
+
+    def after_model():
+        # Модель списка сериализуется pydantic-core сразу в bytes
+        page = UserListResponse.model_validate({"items": rows, "next_cursor": None}, from_attributes=True)
+        return page.__pydantic_serializer__.to_json(page)
+
+    def after_adapter():
+        return adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+
+    def after_orjson():
+        # Строки из SELECT по колонкам -> orjson без pydantic
+        return orjson.dumps({"items": dicts, "next_cursor": None})
+
+    cases = [
+        ("jsonable_encoder + json", before),
+        ("pydantic-core (UserListResponse)", after_model),
+        ("pydantic-core (TypeAdapter)", after_adapter),
+        ("orjson (row dicts)", after_orjson),
+    ]
+
+    print(f"{count} users, best of {repeat}")
+    baseline = None
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=1, repeat=repeat))
+        baseline = baseline or best
+        print(f"  {name:<34} {best * 1000:8.1f} ms  x{baseline / best:5.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,34 @@
+"""Add ticket list indexes
+
+Revision ID: 5f1c2a9d8e34
+Revises: 2d7a3b874023
+Create Date: 2026-10-18 10:12:31.408215
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f1c2a9d8e34'
+down_revision: Union[str, Sequence[str], None] = '2d7a3b874023'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tickets_status_created_at', 'tickets', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_status_priority_created_at', 'tickets', ['status', 'priority', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_user_id_created_at', 'tickets', ['user_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_tickets_created_at', 'tickets', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_created_at', table_name='tickets')
+    op.drop_index('ix_tickets_user_id_created_at', table_name='tickets')
+    op.drop_index('ix_tickets_status_priority_created_at', table_name='tickets')
+    op.drop_index('ix_tickets_status_created_at', table_name='tickets')
@@ -0,0 +1,44 @@
+"""Add audit events
+
+Revision ID: 8b3e6f0c4a12
+Revises: 5f1c2a9d8e34
+Create Date: 2026-10-18 12:40:05.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3e6f0c4a12'
+down_revision: Union[str, Sequence[str], None] = '5f1c2a9d8e34'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('audit_events',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('event_type', sa.String(length=50), nullable=False),
+    sa.Column('actor_id', sa.Integer(), nullable=True),
+    sa.Column('target_id', sa.Integer(), nullable=True),
+    sa.Column('email', sa.String(length=255), nullable=True),
+    sa.Column('ip_address', sa.String(length=45), nullable=True),
+    sa.Column('details', sa.JSON(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_audit_events_event_type_id', 'audit_events', ['event_type', 'id'], unique=False)
+    op.create_index('ix_audit_events_actor_id_id', 'audit_events', ['actor_id', 'id'], unique=False)
+    op.create_index('ix_audit_events_target_id_id', 'audit_events', ['target_id', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_audit_events_target_id_id', table_name='audit_events')
+    op.drop_index('ix_audit_events_actor_id_id', table_name='audit_events')
+    op.drop_index('ix_audit_events_event_type_id', table_name='audit_events')
+    op.drop_table('audit_events')
@@ -0,0 +1,39 @@
+"""Add ticket assignment
+
+Revision ID: 9d2e5b7a1f40
+Revises: 1a6f4d2b9c83
+Create Date: 2026-10-18 19:12:08.457203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d2e5b7a1f40'
+down_revision: Union[str, Sequence[str], None] = '1a6f4d2b9c83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('tickets', sa.Column('assignee_id', sa.Integer(), nullable=True))
+    op.add_column('tickets', sa.Column('category', sa.String(length=50), nullable=True))
+    # Индекс до внешнего ключа: MySQL использует его для FK и не создаёт отдельный
+    op.create_index('ix_tickets_assignee_id_status', 'tickets', ['assignee_id', 'status'], unique=False)
+    op.create_foreign_key('fk_tickets_assignee_id_users', 'tickets', 'users', ['assignee_id'], ['id'])
+    op.add_column('users', sa.Column('skills', sa.String(length=255), nullable=True))
+    op.add_column('users', sa.Column('max_open_tickets', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'max_open_tickets')
+    op.drop_column('users', 'skills')
+    op.drop_constraint('fk_tickets_assignee_id_users', 'tickets', type_='foreignkey')
+    op.drop_index('ix_tickets_assignee_id_status', table_name='tickets')
+    op.drop_column('tickets', 'category')
+    op.drop_column('tickets', 'assignee_id')
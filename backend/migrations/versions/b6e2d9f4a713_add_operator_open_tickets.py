@@ -0,0 +1,34 @@
+"""Add operator open tickets counter
+
+Revision ID: b6e2d9f4a713
+Revises: 9d2e5b7a1f40
+Create Date: 2026-10-18 21:40:26.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e2d9f4a713'
+down_revision: Union[str, Sequence[str], None] = '9d2e5b7a1f40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('open_tickets', sa.Integer(), server_default='0', nullable=False))
+    # Начальное значение — по уже назначенным заявкам
+    op.execute(
+        "UPDATE users SET open_tickets = ("
+        "SELECT COUNT(*) FROM tickets WHERE tickets.assignee_id = users.id "
+        "AND tickets.status IN ('open', 'in_progress'))"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('users', 'open_tickets')
@@ -0,0 +1,33 @@
+"""Add ticket fulltext index
+
+Revision ID: c4d9a7e21f56
+Revises: 8b3e6f0c4a12
+Create Date: 2026-10-18 14:05:47.620913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d9a7e21f56'
+down_revision: Union[str, Sequence[str], None] = '8b3e6f0c4a12'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # FULLTEXT есть только в MySQL; на других БД поиск работает через индекс в памяти
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.create_index('ix_tickets_fulltext', 'tickets', ['title', 'description'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    op.drop_index('ix_tickets_fulltext', table_name='tickets')
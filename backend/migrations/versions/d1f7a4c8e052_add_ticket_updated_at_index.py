@@ -0,0 +1,28 @@
+"""Add ticket updated_at index
+
+Revision ID: d1f7a4c8e052
+Revises: b6e2d9f4a713
+Create Date: 2026-10-18 22:15:47.903516
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd1f7a4c8e052'
+down_revision: Union[str, Sequence[str], None] = 'b6e2d9f4a713'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tickets_updated_at', 'tickets', ['updated_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tickets_updated_at', table_name='tickets')
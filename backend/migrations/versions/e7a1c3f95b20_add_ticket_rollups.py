@@ -0,0 +1,36 @@
+"""Add ticket rollups
+
+Revision ID: e7a1c3f95b20
+Revises: c4d9a7e21f56
+Create Date: 2026-10-18 16:20:12.304871
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a1c3f95b20'
+down_revision: Union[str, Sequence[str], None] = 'c4d9a7e21f56'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Заполняется из истории через POST /api/admin/ticket-rollups/rebuild
+    op.create_table('ticket_rollups',
+    sa.Column('granularity', sa.String(length=10), nullable=False),
+    sa.Column('metric', sa.String(length=20), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('priority', sa.String(length=20), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('granularity', 'metric', 'bucket_start', 'priority')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('ticket_rollups')
@@ -0,0 +1,50 @@
+# tests/conftest.py
+import os
+import tempfile
+
+import pytest
+
+# Настройки читаются при импорте app, поэтому окружение задаётся до него
+TEST_DIR = tempfile.mkdtemp(prefix="support-dashboard-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{TEST_DIR}/primary.db"
+os.environ["DATABASE_REPLICA_URLS"] = ""
+os.environ.setdefault("SECRET_KEY", "test-secret-key-that-is-long-enough-for-hs256")
+os.environ["PASSWORD_HASH_WORKERS"] = "2"
+os.environ["TICKET_SEARCH_BACKEND"] = "memory"
+
+import httpx  # noqa: E402
+
+from app.core.hashing import password_hasher  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.main import app as fastapi_app  # noqa: E402
+from app.models import Base  # noqa: E402
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture(scope="session", autouse=True)
+def hasher_pool():
+    """Пул bcrypt один на сессию тестов"""
+    yield
+    password_hasher.shutdown()
+
+
+@pytest.fixture
+async def db_engine():
+    """Пустая схема в SQLite-файле primary перед каждым тестом"""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    # Соединения aiosqlite привязаны к event loop теста
+    await engine.dispose()
+
+
+@pytest.fixture
+async def client(db_engine):
+    transport = httpx.ASGITransport(app=fastapi_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http_client:
+        yield http_client
@@ -0,0 +1,118 @@
+# tests/test_assignment.py
+import pytest
+from sqlalchemy import func, select
+
+from app.core.security import create_access_token
+from app.database import AsyncSessionLocal
+from app.models import Ticket, User
+from app.services.assignment import AssignmentEngine
+
+
+async def add_operator(cap: int) -> int:
+    async with AsyncSessionLocal() as session:
+        operator = User(email="operator@example.com", password="x", role="operator", max_open_tickets=cap)
+        session.add(operator)
+        await session.commit()
+        return operator.id
+
+
+async def start_workers(count: int):
+    """Движки нескольких воркеров: у каждого своя нагрузка в памяти"""
+    workers = [AssignmentEngine(default_cap=20, pending_max=100) for _ in range(count)]
+    for worker in workers:
+        await worker.reconcile()
+        worker.active = True
+    return workers
+
+
+async def open_tickets_of(operator_id: int) -> int:
+    async with AsyncSessionLocal() as session:
+        return await session.scalar(select(User.open_tickets).where(User.id == operator_id))
+
+
+@pytest.mark.anyio
+async def test_claim_does_not_exceed_cap_across_workers(db_engine):
+    operator_id = await add_operator(cap=2)
+    workers = await start_workers(3)
+
+    claimed = []
+    for worker in workers:
+        for _ in range(2):
+            async with AsyncSessionLocal() as session:
+                claimed.append(await worker.claim(session, None))
+                await session.commit()
+
+    assert claimed.count(operator_id) == 2
+    assert await open_tickets_of(operator_id) == 2
+
+
+@pytest.mark.anyio
+async def test_drain_assigns_within_cap_across_workers(db_engine):
+    operator_id = await add_operator(cap=3)
+    first, second = await start_workers(2)
+
+    async with AsyncSessionLocal() as session:
+        tickets = [Ticket(title=f"ticket {n}", status="open", priority="low", user_id=1) for n in range(6)]
+        session.add_all(tickets)
+        await session.commit()
+    for ticket in tickets[:3]:
+        first.enqueue(ticket.id, None, ticket.created_at)
+    for ticket in tickets[3:]:
+        second.enqueue(ticket.id, None, ticket.created_at)
+
+    await first._drain()
+    await second._drain()
+
+    async with AsyncSessionLocal() as session:
+        assigned = await session.scalar(select(func.count()).where(Ticket.assignee_id == operator_id))
+    assert assigned == 3
+    assert await open_tickets_of(operator_id) == 3
+    # Второй воркер узнал о заполненном операторе из БД и оставил заявки в очереди
+    assert second.pending_count == 3
+
+
+@pytest.mark.anyio
+async def test_patch_with_null_assignee_unassigns_ticket(client):
+    operator_id = await add_operator(cap=2)
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1", "role": "admin"})}
+    response = await client.post("/api/tickets", json={"title": "to reassign"}, headers=headers)
+    ticket_id = response.json()["id"]
+
+    response = await client.patch(f"/api/tickets/{ticket_id}", json={"assignee_id": operator_id}, headers=headers)
+    assert response.json()["assignee_id"] == operator_id
+    assert await open_tickets_of(operator_id) == 1
+
+    response = await client.patch(f"/api/tickets/{ticket_id}", json={"assignee_id": None}, headers=headers)
+    assert response.status_code == 200
+    assert response.json()["assignee_id"] is None
+    assert await open_tickets_of(operator_id) == 0
+
+
+@pytest.mark.anyio
+async def test_demoted_operator_gets_no_tickets(client):
+    operator_id = await add_operator(cap=5)
+    this_worker, other_worker = await start_workers(2)
+    async with AsyncSessionLocal() as session:
+        ticket = Ticket(title="queued", status="open", priority="low", user_id=1)
+        session.add(ticket)
+        await session.commit()
+    other_worker.enqueue(ticket.id, None, ticket.created_at)
+
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "99", "role": "admin"})}
+    response = await client.patch(f"/api/admin/users/{operator_id}/role", json={"role": "user"}, headers=headers)
+    assert response.status_code == 200
+    await this_worker.role_changed(operator_id, "user")
+
+    # Этот воркер убрал оператора сразу, другой ещё помнит его, но БД не отдаёт ему места
+    assert this_worker.load_of(operator_id) == 0 and operator_id not in this_worker._operators
+    async with AsyncSessionLocal() as session:
+        assert await other_worker.claim(session, None) is None
+    await other_worker._drain()
+    assert await open_tickets_of(operator_id) == 0
+    assert other_worker.pending_count == 1
+
+    # Повышение обратно: оператор снова получает заявки
+    await client.patch(f"/api/admin/users/{operator_id}/role", json={"role": "operator"}, headers=headers)
+    await this_worker.role_changed(operator_id, "operator")
+    async with AsyncSessionLocal() as session:
+        assert await this_worker.claim(session, None) == operator_id
@@ -0,0 +1,44 @@
+# tests/test_dataloader.py
+import asyncio
+
+import pytest
+
+from app.core.dataloader import DataLoader
+
+
+@pytest.mark.anyio
+async def test_cancelled_batch_fails_pending_loads():
+    started = asyncio.Event()
+
+    async def hanging_batch(keys):
+        started.set()
+        await asyncio.Event().wait()
+
+    loader = DataLoader(hanging_batch)
+    future = loader.load(1)
+    await started.wait()
+    # Пока пакет выполняется, на задачу есть сильная ссылка
+    assert len(loader._tasks) == 1
+
+    for task in loader._tasks:
+        task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(future, 1)
+    await asyncio.sleep(0)
+    assert not loader._tasks
+
+    # Отменённый ключ не закэширован: повторный load снова идёт в источник
+    assert loader.load(1) is not future
+
+
+@pytest.mark.anyio
+async def test_loads_in_one_iteration_share_a_batch():
+    batches = []
+
+    async def batch(keys):
+        batches.append(list(keys))
+        return {key: key * 10 for key in keys}
+
+    loader = DataLoader(batch)
+    assert await loader.load_many([1, 2, 2, 3]) == [10, 20, 20, 30]
+    assert batches == [[1, 2, 3]]
@@ -0,0 +1,53 @@
+# tests/test_events.py
+import pytest
+
+from app.core.dependencies import get_stream_user
+from app.core.events import allowed_topics, event_hub
+from app.core.exceptions import NotAuthenticatedException
+from app.core.security import create_access_token
+from app.routers.events import event_stream
+
+ADMIN = {"sub": "1", "role": "admin"}
+
+
+@pytest.mark.anyio
+async def test_sse_subscribes_only_when_stream_starts():
+    subscribers = event_hub.subscriber_count
+
+    # Клиент ушёл до первой итерации: подписки нет, освобождать нечего
+    response = await event_stream(topics="tickets", current_user=ADMIN)
+    assert event_hub.subscriber_count == subscribers
+
+    stream = response.body_iterator
+    assert await stream.__anext__() == b"retry: 5000\n\n"
+    assert event_hub.subscriber_count == subscribers + 1
+    await stream.aclose()
+    assert event_hub.subscriber_count == subscribers
+
+
+@pytest.mark.anyio
+async def test_manager_cannot_subscribe_to_all_tickets(client):
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "2", "role": "manager"})}
+
+    response = await client.get("/api/events/stream", params={"topics": "tickets"}, headers=headers)
+
+    assert response.status_code == 403
+    assert allowed_topics("manager") == {"my_tickets"}
+
+
+@pytest.mark.anyio
+async def test_query_token_must_be_short_lived_stream_token(client):
+    access_token = create_access_token({"sub": "2", "role": "operator"})
+
+    # Основной JWT в строке запроса (и в логах доступа) не принимается
+    with pytest.raises(NotAuthenticatedException):
+        await get_stream_user(token=access_token, credentials=None)
+
+    response = await client.post("/api/events/token", headers={"Authorization": "Bearer " + access_token})
+    assert response.status_code == 200
+    stream_token = response.json()["token"]
+    assert (await get_stream_user(token=stream_token, credentials=None))["sub"] == "2"
+
+    # Токен подписки не годится для остального API
+    response = await client.get("/api/tickets", headers={"Authorization": "Bearer " + stream_token})
+    assert response.status_code == 401
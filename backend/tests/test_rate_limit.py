@@ -0,0 +1,37 @@
+# tests/test_rate_limit.py
+import time
+
+import pytest
+
+from app.core.rate_limit import MemoryRateLimitBackend
+
+
+@pytest.mark.anyio
+async def test_cycling_keys_does_not_reset_a_throttled_bucket():
+    backend = MemoryRateLimitBackend(max_keys=3)
+    rate, capacity = 1 / 60, 1
+
+    assert await backend.consume("login:email:victim", rate, capacity) == 0
+    assert await backend.consume("login:email:victim", rate, capacity) > 0
+
+    # Бакеты ещё не наполнились: новые ключи сверх max_keys получают отказ, а не вытесняют старые
+    for n in range(10):
+        await backend.consume(f"login:email:random{n}", rate, capacity)
+
+    assert await backend.consume("login:email:victim", rate, capacity) > 0
+    assert len(backend._buckets) == 3
+
+
+@pytest.mark.anyio
+async def test_full_buckets_are_evicted_for_new_keys():
+    backend = MemoryRateLimitBackend(max_keys=2)
+    rate, capacity = 1000.0, 1
+
+    await backend.consume("a", rate, capacity)
+    await backend.consume("b", rate, capacity)
+    await backend.consume("a", rate, capacity)
+    # При rate=1000 бакеты наполняются за миллисекунду
+    time.sleep(0.01)
+
+    assert await backend.consume("c", rate, capacity) == 0
+    assert set(backend._buckets) == {"a", "c"}
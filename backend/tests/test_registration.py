@@ -0,0 +1,31 @@
+# tests/test_registration.py
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database import AsyncSessionLocal
+from app.models import User
+
+CONCURRENT_REQUESTS = 8
+
+
+@pytest.mark.anyio
+async def test_concurrent_registration_with_same_email(client):
+    """Одновременные регистрации одного email: ровно одна успешна, остальные — 409"""
+    payload = {"email": "race@example.com", "password": "secret123", "full_name": "Race"}
+
+    responses = await asyncio.gather(*(
+        client.post("/auth/register", json=payload) for _ in range(CONCURRENT_REQUESTS)
+    ))
+
+    statuses = [response.status_code for response in responses]
+    assert statuses.count(200) == 1
+    assert statuses.count(409) == CONCURRENT_REQUESTS - 1
+    for response in responses:
+        if response.status_code == 409:
+            assert response.json()["error"]["code"] == "EMAIL_EXISTS"
+
+    async with AsyncSessionLocal() as session:
+        count = await session.scalar(select(func.count()).select_from(User).where(User.email == payload["email"]))
+    assert count == 1
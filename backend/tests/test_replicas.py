@@ -0,0 +1,63 @@
+# tests/test_replicas.py
+import pytest
+from sqlalchemy import select
+
+import app.database as database
+from app.core.security import create_access_token
+from app.database import AsyncSessionLocal, ReplicaRouter
+from app.models import Base, Ticket
+
+from .conftest import TEST_DIR
+
+
+@pytest.fixture
+async def replica_router(db_engine, monkeypatch):
+    """Реплика — отдельный SQLite-файл со своими данными, чтобы было видно, куда ушло чтение"""
+    router = ReplicaRouter([f"sqlite:///{TEST_DIR}/replica.db"])
+    replica_engine = router.replicas[0].engine
+    async with replica_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    async with router.replicas[0].session_factory() as session:
+        session.add(Ticket(title="from replica", status="open", priority="low", user_id=1))
+        await session.commit()
+
+    monkeypatch.setattr(database, "replica_router", router)
+    yield router
+    await router.dispose()
+
+
+@pytest.mark.anyio
+async def test_read_sessions_use_replica_and_fall_back_to_primary(replica_router):
+    async with AsyncSessionLocal() as session:
+        session.add(Ticket(title="from primary", status="open", priority="low", user_id=1))
+        await session.commit()
+
+    async def read_titles():
+        async with replica_router.read_session_factory()() as session:
+            return list((await session.execute(select(Ticket.title))).scalars())
+
+    assert await read_titles() == ["from replica"]
+
+    replica_router.replicas[0].mark_unhealthy()
+    assert await read_titles() == ["from primary"]
+
+    # Проверка здоровья возвращает доступную реплику в ротацию
+    await replica_router.check_health()
+    assert replica_router.replicas[0].healthy
+    assert await read_titles() == ["from replica"]
+
+
+@pytest.mark.anyio
+async def test_get_read_db_serves_list_from_replica(client, replica_router):
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1", "role": "admin"})}
+
+    response = await client.get("/api/tickets", headers=headers)
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()["items"]] == ["from replica"]
+
+    # Запись идёт в primary через get_db и на реплике не видна
+    response = await client.post("/api/tickets", json={"title": "new ticket"}, headers=headers)
+    assert response.status_code == 200
+    response = await client.get("/api/tickets", headers=headers)
+    assert [item["title"] for item in response.json()["items"]] == ["from replica"]
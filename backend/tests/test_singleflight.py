@@ -0,0 +1,40 @@
+# tests/test_singleflight.py
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+
+@pytest.mark.anyio
+async def test_call_after_last_waiter_cancelled_starts_new_flight():
+    flight = SingleFlight("test", timeout=5)
+    started = []
+
+    async def load():
+        started.append(1)
+        await asyncio.sleep(0.05)
+        return len(started)
+
+    first = asyncio.ensure_future(flight.do("key", load))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    # Запрос в окне между отменой и done-callback не получает CancelledError
+    assert await flight.do("key", load) == 2
+    with pytest.raises(asyncio.CancelledError):
+        await first
+
+
+@pytest.mark.anyio
+async def test_concurrent_calls_share_one_flight():
+    flight = SingleFlight("test", timeout=5)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    assert await asyncio.gather(*(flight.do("key", load) for _ in range(5))) == ["value"] * 5
+    assert len(calls) == 1
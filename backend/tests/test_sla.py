@@ -0,0 +1,86 @@
+# tests/test_sla.py
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select, update
+
+from app.core.leader import LeaderElection
+from app.database import AsyncSessionLocal
+from app.models import Ticket
+from app.models.sla import SlaBreach
+from app.services import sla
+from app.services.sla import RESOLUTION, RESPONSE, SlaEngine
+
+
+def make_engine() -> SlaEngine:
+    return SlaEngine(
+        response_minutes={"medium": 60},
+        resolution_minutes={"medium": 240},
+        election=LeaderElection("sla-test", ttl=30),
+    )
+
+
+async def add_ticket(created_at: datetime, status: str = "open") -> int:
+    async with AsyncSessionLocal() as session:
+        ticket = Ticket(title="sla", status=status, priority="medium", user_id=1, created_at=created_at)
+        session.add(ticket)
+        await session.commit()
+        return ticket.id
+
+
+@pytest.mark.anyio
+async def test_catch_up_tracks_tickets_changed_without_events(db_engine):
+    engine = make_engine()
+    await engine._load()
+    now = datetime.utcnow().replace(microsecond=0)
+
+    # Заявки записаны другим воркером: лидер не получил о них событий
+    created_id = await add_ticket(now)
+    closed_id = await add_ticket(now)
+    engine.track(closed_id, "open", "medium", now)
+    async with AsyncSessionLocal() as session:
+        await session.execute(update(Ticket).where(Ticket.id == closed_id).values(status="closed"))
+        await session.commit()
+
+    await engine._catch_up()
+
+    assert set(engine.scheduler._entries) == {(created_id, RESPONSE), (created_id, RESOLUTION)}
+
+
+@pytest.mark.anyio
+async def test_fire_rechecks_ticket_state_before_recording(db_engine):
+    engine = make_engine()
+    created_at = datetime.utcnow().replace(microsecond=0) - timedelta(hours=2)
+    overdue_id = await add_ticket(created_at)
+    resolved_id = await add_ticket(created_at, status="resolved")
+    deadline = 0.0  # _fire пересчитывает срок по строке из БД
+
+    await engine._fire([((overdue_id, RESPONSE), deadline), ((resolved_id, RESPONSE), deadline)])
+
+    async with AsyncSessionLocal() as session:
+        breaches = (await session.execute(select(SlaBreach.ticket_id, SlaBreach.kind))).all()
+    assert [tuple(row) for row in breaches] == [(overdue_id, RESPONSE)]
+    # Срок решения ещё не наступил и остаётся в очереди; решённая заявка забыта
+    assert set(engine.scheduler._entries) == {(overdue_id, RESOLUTION)}
+
+
+@pytest.mark.anyio
+async def test_failed_fire_reschedules_due_deadlines(db_engine, monkeypatch):
+    engine = make_engine()
+    created_at = datetime.utcnow().replace(microsecond=0) - timedelta(hours=2)
+    ticket_id = await add_ticket(created_at)
+    engine.track(ticket_id, "open", "medium", created_at)
+
+    def broken_insert(dialect):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(sla, "_insert_ignore", broken_insert)
+    engine._wakeup = asyncio.Event()
+    timer = asyncio.ensure_future(engine._run_timer())
+    await asyncio.sleep(0.05)
+    timer.cancel()
+
+    # Нарушение не записано: срок вернулся в очередь, а не считается зафиксированным
+    assert (ticket_id, RESPONSE) in engine.scheduler
+    assert not engine._breached
@@ -0,0 +1,24 @@
+# tests/test_stats.py
+import pytest
+
+from app.core.security import create_access_token
+from app.services.stats import dashboard_stats
+
+
+@pytest.mark.anyio
+async def test_resolved_this_week_matches_after_reconcile(client):
+    headers = {"Authorization": "Bearer " + create_access_token({"sub": "1", "role": "admin"})}
+    await dashboard_stats.reconcile()
+    response = await client.post("/api/tickets", json={"title": "to resolve"}, headers=headers)
+    ticket_id = response.json()["id"]
+
+    await client.patch(f"/api/tickets/{ticket_id}", json={"status": "resolved"}, headers=headers)
+    assert dashboard_stats.resolved_this_week == 1
+    await dashboard_stats.reconcile()
+    assert dashboard_stats.resolved_this_week == 1
+
+    # Переход дальше не отменяет решение: оба пути считают переходы в resolved
+    await client.patch(f"/api/tickets/{ticket_id}", json={"status": "closed"}, headers=headers)
+    await dashboard_stats.reconcile()
+    assert dashboard_stats.resolved_this_week == 1
+    assert dashboard_stats.active_tickets == 0